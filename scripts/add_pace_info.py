@@ -4,29 +4,47 @@
 既存のrecord_results.pyを拡張
 """
 
-import json
 import sys
-from collections import Counter
 
-def analyze_pace_from_horses(horses):
+from json_io import load_json, save_json
+
+
+def count_running_styles(horses):
     """
-    出走馬の脚質からレース展開を予測
+    出走馬の脚質を集計
     
     Args:
         horses: 馬データのリスト
         
     Returns:
-        str: 'ハイペース', 'ミドルペース', 'スローペース'
+        tuple: (逃げ頭数, 先行頭数, 脚質推定済み頭数)
     """
-    runstyles = [h.get('推定脚質', '不明') for h in horses if '推定脚質' in h]
+    nige_count = 0
+    senkou_count = 0
+    total = 0
     
-    if not runstyles:
-        return 'ミドルペース'
+    for h in horses:
+        if '推定脚質' not in h:
+            continue
+        runstyle = h['推定脚質']
+        total += 1
+        if runstyle == '逃げ':
+            nige_count += 1
+        elif runstyle == '先行':
+            senkou_count += 1
+    
+    return nige_count, senkou_count, total
+
+
+def classify_pace(nige_count, senkou_count, total):
+    """
+    脚質の頭数からレース展開を判定
     
-    counter = Counter(runstyles)
-    nige_count = counter.get('逃げ', 0)
-    senkou_count = counter.get('先行', 0)
-    total = len(runstyles)
+    Returns:
+        str: 'ハイペース', 'ミドルペース', 'スローペース'
+    """
+    if not total:
+        return 'ミドルペース'
     
     # 逃げ馬が3頭以上、または逃げ+先行が50%以上
     if nige_count >= 3 or (nige_count + senkou_count) / total >= 0.5:
@@ -38,7 +56,20 @@ def analyze_pace_from_horses(horses):
         return 'ミドルペース'
 
 
-def add_pace_info_to_results(race_data_file, results_file, output_file):
+def analyze_pace_from_horses(horses):
+    """
+    出走馬の脚質からレース展開を予測
+    
+    Args:
+        horses: 馬データのリスト
+        
+    Returns:
+        str: 'ハイペース', 'ミドルペース', 'スローペース'
+    """
+    return classify_pace(*count_running_styles(horses))
+
+
+def add_pace_info_to_results(race_data_file, results_file, output_file, compact=False):
     """
     結果データに展開情報を追加
     
@@ -46,43 +77,40 @@ def add_pace_info_to_results(race_data_file, results_file, output_file):
         race_data_file: race_data_YYYYMMDD.json
         results_file: latest_results.json または results_YYYYMMDD.json
         output_file: 出力先ファイル
+        compact: Trueなら出力をインデントなしで書き込む
     """
     # レースデータを読み込み
     try:
-        with open(race_data_file, 'r', encoding='utf-8') as f:
-            race_data = json.load(f)
+        race_data = load_json(race_data_file)
     except FileNotFoundError:
         print(f"❌ レースデータが見つかりません: {race_data_file}")
         return False
     
     # 結果データを読み込み
     try:
-        with open(results_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
+        results = load_json(results_file)
     except FileNotFoundError:
         print(f"❌ 結果データが見つかりません: {results_file}")
         return False
     
-    # レースIDごとの馬データをマップ作成
-    race_horses_map = {}
+    # レースIDごとに脚質の頭数を1回だけ集計
+    pace_counts = {}
     for race in race_data.get('races', []):
         race_id = race.get('race_id')
         if race_id:
-            race_horses_map[race_id] = race.get('horses', [])
+            pace_counts[race_id] = count_running_styles(race.get('horses', []))
     
     # 各結果に展開情報を追加
     updated_count = 0
     for result in results.get('races', []):
         race_id = result.get('race_id')
-        if race_id and race_id in race_horses_map:
-            horses = race_horses_map[race_id]
-            predicted_pace = analyze_pace_from_horses(horses)
+        if race_id and race_id in pace_counts:
+            predicted_pace = classify_pace(*pace_counts[race_id])
             result['predicted_pace'] = predicted_pace
             updated_count += 1
     
     # 出力
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    save_json(results, output_file, compact=compact)
     
     print(f"✅ 展開情報を追加しました: {updated_count} レース")
     print(f"📄 出力ファイル: {output_file}")
@@ -90,13 +118,16 @@ def add_pace_info_to_results(race_data_file, results_file, output_file):
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print("Usage: python add_pace_info.py <race_data.json> <results.json> <output.json>")
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    compact = '--compact' in sys.argv[1:]
+    
+    if len(args) < 3:
+        print("Usage: python add_pace_info.py <race_data.json> <results.json> <output.json> [--compact]")
         sys.exit(1)
     
-    race_data_file = sys.argv[1]
-    results_file = sys.argv[2]
-    output_file = sys.argv[3]
+    race_data_file = args[0]
+    results_file = args[1]
+    output_file = args[2]
     
-    success = add_pace_info_to_results(race_data_file, results_file, output_file)
+    success = add_pace_info_to_results(race_data_file, results_file, output_file, compact=compact)
     sys.exit(0 if success else 1)
@@ -18,16 +18,90 @@ A～Dの4軸でスコアを計算してdes_scoreフィールドを更新する
 - エラーハンドリングの強化
 """
 
-import json
+import argparse
+import os
 import sys
 from pathlib import Path
-import shutil
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+
+from json_io import load_json, save_json
+
+
+# 先頭の整数部分（"479(-5)" → 479, " 1600" → 1600）
+_NUM_RE = re.compile(r"^\s*-?\d+")
+
+# 脚質の並び順（脚質構成の集計はこの順のリストで持つ）
+_STYLES = ("逃げ", "先行", "差し", "追込", "不明")
+_STYLE_IDX = {style: i for i, style in enumerate(_STYLES)}
+
+# 同距離・同馬場での推定着順ごとのポイント（1着10点 / 2着7点 / 3着3点）
+_SAME_COND_POINTS = (0, 10, 7, 3)
 
 
 # ====================================================================
 # ユーティリティ関数
 # ====================================================================
+def _to_int(value, default=0):
+    """
+    文字列の先頭にある整数を取り出す（例外を使わない int() 変換）
+    
+    Args:
+        value: 変換対象（int / str / None）
+        default: 整数が取り出せない場合の値
+    
+    Returns:
+        int: 変換結果（取り出せない場合はdefault）
+    """
+    if isinstance(value, int):
+        return value
+    if not value:
+        return default
+    if isinstance(value, str) and value.isdecimal():
+        # "1600" のような純粋な数字列は正規表現を通さない
+        return int(value)
+    
+    m = _NUM_RE.match(str(value))
+    return int(m.group()) if m else default
+
+
+@lru_cache(maxsize=None)
+def _parse_corner_position(corner_position):
+    """
+    コーナー通過順を (最初の位置, 最後の位置) に分解する
+    
+    "1-1-1-1" のような文字列は全馬・全軸で繰り返し現れるため、
+    1文字列につき1回だけ分解して結果を使い回す
+    
+    Args:
+        corner_position (str): コーナー通過順（例: "1-1-1-1", "9-9-8-8"）
+    
+    Returns:
+        tuple: (最初のコーナー位置, 最後のコーナー位置)（取得できない場合はNone）
+    """
+    positions = corner_position.split('-')
+    
+    return _to_int(positions[0], None), _to_int(positions[-1], None)
+
+
+def corner_positions(corner_position):
+    """
+    コーナー通過順の最初と最後の位置を取得
+    
+    Args:
+        corner_position (str): コーナー通過順
+    
+    Returns:
+        tuple: (最初のコーナー位置, 最後のコーナー位置)（取得できない場合はNone）
+    """
+    if not corner_position or not isinstance(corner_position, str):
+        return None, None
+    
+    return _parse_corner_position(corner_position)
+
+
 def extract_rank_from_corner_position(corner_position):
     """
     コーナー通過順から着順を推定
@@ -38,18 +112,10 @@ def extract_rank_from_corner_position(corner_position):
     Returns:
         int: 推定着順（取得できない場合は99）
     """
-    if not corner_position:
-        return 99
+    # "1-1-1-1" → 最後の位置 = 着順
+    last_position = corner_positions(corner_position)[1]
     
-    try:
-        # "1-1-1-1" → 最後の位置 = 着順
-        positions = corner_position.split('-')
-        if positions:
-            return int(positions[-1])
-    except:
-        pass
-    
-    return 99
+    return 99 if last_position is None else last_position
 
 
 def estimate_running_style(past_races):
@@ -65,26 +131,39 @@ def estimate_running_style(past_races):
     if not past_races:
         return "不明"
     
-    front_count = 0
-    mid_count = 0
-    closer_count = 0
+    style_votes = [0, 0, 0]
     
-    for race in past_races[:5]:  # 最近5走
-        corner_position = race.get('コーナー通過順', '')
+    for race in islice(past_races, 5):  # 最近5走（スライスのコピーを作らない）
+        # 最初のコーナーの位置
+        first_pos = corner_positions(race.get('コーナー通過順', ''))[0]
         
-        if corner_position:
-            try:
-                # 最初のコーナーの位置
-                first_pos = int(corner_position.split('-')[0])
-                
-                if first_pos <= 2:
-                    front_count += 1  # 逃げ
-                elif first_pos <= 5:
-                    mid_count += 1    # 先行
-                else:
-                    closer_count += 1  # 差し/追込
-            except:
-                pass
+        if first_pos is not None:
+            style_votes[_style_vote_index(first_pos)] += 1
+    
+    return running_style_from_votes(style_votes)
+
+
+def _style_vote_index(first_pos):
+    """最初のコーナー位置 → 脚質の票（0: 逃げ / 1: 先行 / 2: 差し・追込）"""
+    if first_pos <= 2:
+        return 0
+    elif first_pos <= 5:
+        return 1
+    else:
+        return 2
+
+
+def running_style_from_votes(style_votes):
+    """
+    近5走の脚質の票から脚質を判定
+    
+    Args:
+        style_votes (list): [逃げ, 先行, 差し・追込] の票数
+    
+    Returns:
+        str: 脚質（逃げ/先行/差し/不明）
+    """
+    front_count, mid_count, closer_count = style_votes
     
     # 多数決で判定
     max_count = max(front_count, mid_count, closer_count)
@@ -99,7 +178,132 @@ def estimate_running_style(past_races):
         return "差し"
 
 
-def calculate_missing_data_rescue_score(horse, race_info):
+def build_race_context(race_info):
+    """
+    レース内の全馬で共通の判定条件を取り出す
+
+    Args:
+        race_info (dict): レース情報
+
+    Returns:
+        dict: dist（距離）/ track（トラック）/ race_id / long_distance（救済スコアの1800m以上判定）
+    """
+    return {
+        'dist': _to_int(race_info.get('距離', 0)),
+        'track': race_info.get('トラック', ''),
+        'race_id': race_info.get('race_id'),
+        'long_distance': _rescue_target_distance(race_info) >= 1800,
+    }
+
+
+def _rescue_target_distance(race_info):
+    """救済スコア用にレース距離を解釈する（解釈できなければ0）。"""
+    target_distance = race_info.get('距離', 0)
+    try:
+        return int(str(target_distance).replace('m', '').strip())
+    except Exception:
+        return 0
+
+
+def _gather_stats(horse, race_ctx):
+    """
+    過去走データを1回だけ走査し、4軸のスコア計算に使う集計値を求める
+
+    Args:
+        horse (dict): 馬データ
+        race_ctx (dict): build_race_context() の判定条件
+
+    Returns:
+        dict: 集計値
+            n: 過去走数
+            same_cond_score: 同距離(±200m)・同馬場での着順ポイント合計
+            ranks_recent3: 近3走の推定着順
+            wins5 / places5 / top2_5: 近5走の1着数 / 連対数 / 推定着順2以内の数
+            dist_perf / dist_count: 同距離帯(±300m)の3着以内数 / 出走数
+            track_perf / track_count: 同馬場の3着以内数 / 出走数
+            jockey_wins / jockey_total: 同騎手での1着数 / 騎乗数
+            front3 / closer3: 近3走の先行(1角3番手以内) / 後方(1角8番手以下)回数
+            style_votes: 近5走の脚質の票（running_style_from_votes() 用）
+            weights: 近2走の馬体重（取得不可はNone）
+    """
+    past_races = horse.get('past_races', [])
+    target_distance = race_ctx['dist']
+    target_track = race_ctx['track']
+    jockey = horse.get('騎手', '')
+
+    same_cond_score = 0
+    ranks_recent3 = []
+    wins5 = places5 = top2_5 = 0
+    dist_perf = dist_count = 0
+    track_perf = track_count = 0
+    jockey_wins = jockey_total = 0
+    front3 = closer3 = 0
+    style_votes = [0, 0, 0]
+    weights = []
+
+    for i, race in enumerate(past_races):
+        distance_diff = abs(_to_int(race.get('距離', 0)) - target_distance)
+        first_position, last_position = corner_positions(race.get('コーナー通過順', ''))
+        # コーナー通過順の最後の位置 = 推定着順
+        rank = 99 if last_position is None else last_position
+
+        if race.get('距離種別', '') == target_track:
+            track_count += 1
+            if rank <= 3:
+                track_perf += 1
+            if distance_diff <= 200 and rank < len(_SAME_COND_POINTS):
+                same_cond_score += _SAME_COND_POINTS[rank]
+
+        if distance_diff <= 300:
+            dist_count += 1
+            if rank <= 3:
+                dist_perf += 1
+
+        if jockey and race.get('騎手', '') == jockey:
+            jockey_total += 1
+            if rank == 1:
+                jockey_wins += 1
+
+        if i < 5:
+            if first_position is not None:
+                style_votes[_style_vote_index(first_position)] += 1
+            wins5 += rank == 1
+            places5 += 1 <= rank <= 2
+            top2_5 += rank <= 2
+
+        if i < 3:
+            ranks_recent3.append(rank)
+            if first_position is not None:
+                if first_position <= 3:
+                    front3 += 1
+                elif first_position >= 8:
+                    closer3 += 1
+
+        if i < 2:
+            # "479(-5)" → 479（先頭の整数で "(" の手前まで）
+            weights.append(_to_int(race.get('馬体重', '0(0)'), None))
+
+    return {
+        'n': len(past_races),
+        'same_cond_score': same_cond_score,
+        'ranks_recent3': ranks_recent3,
+        'wins5': wins5,
+        'places5': places5,
+        'top2_5': top2_5,
+        'dist_perf': dist_perf,
+        'dist_count': dist_count,
+        'track_perf': track_perf,
+        'track_count': track_count,
+        'jockey_wins': jockey_wins,
+        'jockey_total': jockey_total,
+        'front3': front3,
+        'closer3': closer3,
+        'style_votes': style_votes,
+        'weights': weights,
+    }
+
+
+def calculate_missing_data_rescue_score(horse, race_info, race_ctx=None):
     """過去走が取れない場合でも最低限の相対評価を残すための救済スコア。"""
     rescue = 0.0
 
@@ -143,12 +347,11 @@ def calculate_missing_data_rescue_score(horse, race_info):
     if waku is not None:
         rescue += 2 if 1 <= waku <= 4 else 1
 
-    target_distance = race_info.get('距離', 0)
-    try:
-        target_distance = int(str(target_distance).replace('m', '').strip())
-    except Exception:
-        target_distance = 0
-    if target_distance >= 1800:
+    if race_ctx is not None:
+        long_distance = race_ctx['long_distance']
+    else:
+        long_distance = _rescue_target_distance(race_info) >= 1800
+    if long_distance:
         rescue += 2
 
     return round(min(rescue, 20.0), 1)
@@ -157,91 +360,50 @@ def calculate_missing_data_rescue_score(horse, race_info):
 # ====================================================================
 # A. 過去実績スコア（40点満点）
 # ====================================================================
-def calculate_past_performance_score(horse, race_info):
+def calculate_past_performance_score(horse, race_info, stats=None):
     """
     過去実績スコアを計算
     
     Args:
         horse (dict): 馬データ
         race_info (dict): レース情報
+        stats (dict): _gather_stats() の集計値（省略時はここで集計）
     
     Returns:
         float: 過去実績スコア（0～40点）
     """
     score = 0.0
-    past_races = horse.get('past_races', [])
     
-    if not past_races:
+    if stats is None:
+        stats = _gather_stats(horse, build_race_context(race_info))
+    
+    if not stats['n']:
         return score
     
     # 1. 同距離・同馬場での成績（20点）
-    target_distance = race_info.get('距離', 0)
-    target_track = race_info.get('トラック', '')
-    
-    same_condition_score = 0
-    for race in past_races:
-        try:
-            race_distance = int(race.get('距離', 0))
-        except:
-            race_distance = 0
-        
-        race_track = race.get('距離種別', '')
-        
-        # 距離の許容範囲: ±200m
-        if abs(race_distance - target_distance) <= 200 and race_track == target_track:
-            # コーナー通過順から着順を推定
-            corner_position = race.get('コーナー通過順', '')
-            rank = extract_rank_from_corner_position(corner_position)
-            
-            if rank == 1:
-                same_condition_score += 10
-            elif rank == 2:
-                same_condition_score += 7
-            elif rank == 3:
-                same_condition_score += 3
-    
+    # 距離の許容範囲: ±200m、着順はコーナー通過順から推定
     # 最大20点
-    score += min(same_condition_score, 20)
+    score += min(stats['same_cond_score'], 20)
     
     # 2. 近3走の着順推移（10点）
-    recent_3_races = past_races[:3]
-    if len(recent_3_races) >= 2:
-        ranks = []
-        for race in recent_3_races:
-            corner_position = race.get('コーナー通過順', '')
-            rank = extract_rank_from_corner_position(corner_position)
-            ranks.append(rank)
-        
-        # 上昇傾向判定（新しい順なので、数値が減少していれば上昇傾向）
-        if len(ranks) >= 3:
-            if ranks[0] < ranks[1] and ranks[1] < ranks[2]:
-                score += 10  # 上昇傾向
-            elif all(r <= 3 for r in ranks):
-                score += 7   # 安定して好走
+    ranks = stats['ranks_recent3']
+    
+    # 上昇傾向判定（新しい順なので、数値が減少していれば上昇傾向）
+    if len(ranks) >= 3:
+        if ranks[0] < ranks[1] < ranks[2]:
+            score += 10  # 上昇傾向
+        elif all(r <= 3 for r in ranks):
+            score += 7   # 安定して好走
     
     # 3. 通算勝率・連対率（10点）
-    if len(past_races) > 0:
-        wins = 0
-        places = 0
-        
-        for race in past_races[:5]:
-            corner_position = race.get('コーナー通過順', '')
-            rank = extract_rank_from_corner_position(corner_position)
-            
-            if rank == 1:
-                wins += 1
-                places += 1
-            elif rank == 2:
-                places += 1
-        
-        if len(past_races[:5]) > 0:
-            win_rate = wins / len(past_races[:5])
-            place_rate = places / len(past_races[:5])
-            
-            if win_rate >= 0.10:  # 10%以上
-                score += 5
-            if place_rate >= 0.30:  # 30%以上
-                score += 5
+    recent_count = min(stats['n'], 5)
+    win_rate = stats['wins5'] / recent_count
+    place_rate = stats['places5'] / recent_count
+    
+    if win_rate >= 0.10:  # 10%以上
+        score += 5
+    if place_rate >= 0.30:  # 30%以上
+        score += 5
     
     return round(score, 1)
 
@@ -249,44 +411,27 @@ def calculate_past_performance_score(horse, race_info):
 # ====================================================================
 # B. 血統・適性スコア（30点満点）
 # ====================================================================
-def calculate_pedigree_score(horse, race_info):
+def calculate_pedigree_score(horse, race_info, stats=None):
     """
     血統・適性スコアを計算
     
     Args:
         horse (dict): 馬データ
         race_info (dict): レース情報
+        stats (dict): _gather_stats() の集計値（省略時はここで集計）
     
     Returns:
         float: 血統・適性スコア（0～30点）
     """
     score = 0.0
     
-    # 1. 父系・母系の距離適性（15点）
-    target_distance = race_info.get('距離', 0)
-    past_races = horse.get('past_races', [])
-    
-    same_distance_performance = 0
-    same_distance_count = 0
+    if stats is None:
+        stats = _gather_stats(horse, build_race_context(race_info))
     
-    for race in past_races:
-        try:
-            race_distance = int(race.get('距離', 0))
-        except:
-            race_distance = 0
-        
-        # 距離帯判定（±300m）
-        if abs(race_distance - target_distance) <= 300:
-            same_distance_count += 1
-            
-            corner_position = race.get('コーナー通過順', '')
-            rank = extract_rank_from_corner_position(corner_position)
-            
-            if rank <= 3:
-                same_distance_performance += 1
-    
-    if same_distance_count > 0:
-        performance_rate = same_distance_performance / same_distance_count
+    # 1. 父系・母系の距離適性（15点）
+    # 距離帯判定（±300m）
+    if stats['dist_count'] > 0:
+        performance_rate = stats['dist_perf'] / stats['dist_count']
         
         if performance_rate >= 0.5:  # 50%以上で好成績
             score += 15  # 適性○
@@ -294,25 +439,8 @@ def calculate_pedigree_score(horse, race_info):
             score += 8   # 適性△
     
     # 2. ダート/芝の血統適性（10点）
-    target_track = race_info.get('トラック', '')
-    
-    track_performance = 0
-    track_count = 0
-    
-    for race in past_races:
-        race_track = race.get('距離種別', '')
-        
-        if race_track == target_track:
-            track_count += 1
-            
-            corner_position = race.get('コーナー通過順', '')
-            rank = extract_rank_from_corner_position(corner_position)
-            
-            if rank <= 3:
-                track_performance += 1
-    
-    if track_count > 0:
-        track_rate = track_performance / track_count
+    if stats['track_count'] > 0:
+        track_rate = stats['track_perf'] / stats['track_count']
         
         if track_rate >= 0.4:  # 40%以上
             score += 10
@@ -320,24 +448,15 @@ def calculate_pedigree_score(horse, race_info):
             score += 5
     
     # 3. 馬体重推移の安定性（5点）
-    if len(past_races) >= 2:
-        try:
-            # 最新の馬体重（例: "479(-5)"）
-            latest_weight_text = past_races[0].get('馬体重', '0(0)')
-            latest_weight = int(latest_weight_text.split('(')[0])
-            
-            # 前走の馬体重
-            prev_weight_text = past_races[1].get('馬体重', '0(0)')
-            prev_weight = int(prev_weight_text.split('(')[0])
-            
-            weight_diff = abs(latest_weight - prev_weight)
-            
-            if weight_diff <= 3:
-                score += 5
-            elif weight_diff >= 10:
-                score = max(0, score - 3)  # マイナスにならないように
-        except:
-            pass
+    # 最新の馬体重と前走の馬体重（取得できない場合は判定しない）
+    weights = stats['weights']
+    if len(weights) >= 2 and None not in weights:
+        weight_diff = abs(weights[0] - weights[1])
+        
+        if weight_diff <= 3:
+            score += 5
+        elif weight_diff >= 10:
+            score = max(0, score - 3)  # マイナスにならないように
     
     return round(score, 1)
 
@@ -345,57 +464,35 @@ def calculate_pedigree_score(horse, race_info):
 # ====================================================================
 # C. 騎手・厩舎スコア（20点満点）
 # ====================================================================
-def calculate_jockey_trainer_score(horse, race_info):
+def calculate_jockey_trainer_score(horse, race_info, stats=None):
     """
     騎手・厩舎スコアを計算
     
     Args:
         horse (dict): 馬データ
         race_info (dict): レース情報
+        stats (dict): _gather_stats() の集計値（省略時はここで集計）
     
     Returns:
         float: 騎手・厩舎スコア（0～20点）
     """
     score = 0.0
     
-    # 1. 騎手の当該コース成績（10点）
-    jockey = horse.get('騎手', '')
-    past_races = horse.get('past_races', [])
+    if stats is None:
+        stats = _gather_stats(horse, build_race_context(race_info))
     
-    if jockey:
-        jockey_wins = 0
-        jockey_total = 0
-        
-        for race in past_races:
-            if race.get('騎手', '') == jockey:
-                jockey_total += 1
-                
-                corner_position = race.get('コーナー通過順', '')
-                rank = extract_rank_from_corner_position(corner_position)
-                
-                if rank == 1:
-                    jockey_wins += 1
+    # 1. 騎手の当該コース成績（10点）
+    if stats['jockey_total'] > 0:
+        jockey_win_rate = stats['jockey_wins'] / stats['jockey_total']
         
-        if jockey_total > 0:
-            jockey_win_rate = jockey_wins / jockey_total
-            
-            if jockey_win_rate >= 0.15:  # 15%以上
-                score += 10
-            elif jockey_win_rate >= 0.05:
-                score += 5
+        if jockey_win_rate >= 0.15:  # 15%以上
+            score += 10
+        elif jockey_win_rate >= 0.05:
+            score += 5
     
     # 2. 厩舎の直近調整成績（10点）
-    if len(past_races) > 0:
-        places = 0
-        
-        for race in past_races[:5]:
-            corner_position = race.get('コーナー通過順', '')
-            rank = extract_rank_from_corner_position(corner_position)
-            
-            if rank <= 2:
-                places += 1
-        
-        place_rate = places / len(past_races[:5])
+    if stats['n'] > 0:
+        place_rate = stats['top2_5'] / min(stats['n'], 5)
         
         if place_rate >= 0.30:  # 30%以上
             score += 10
@@ -408,44 +505,29 @@ def calculate_jockey_trainer_score(horse, race_info):
 # ====================================================================
 # D. 展開適性スコア（10点満点）
 # ====================================================================
-def calculate_race_style_score(horse, race_info):
+def calculate_race_style_score(horse, race_info, stats=None):
     """
     展開適性スコアを計算
     
     Args:
         horse (dict): 馬データ
         race_info (dict): レース情報
+        stats (dict): _gather_stats() の集計値（省略時はここで集計）
     
     Returns:
         float: 展開適性スコア（0～10点）
     """
     score = 0.0
     
-    # 1. 脚質判定（7点）
-    past_races = horse.get('past_races', [])
+    if stats is None:
+        stats = _gather_stats(horse, build_race_context(race_info))
     
-    if len(past_races) > 0:
-        front_runner_count = 0
-        closer_count = 0
-        
-        for race in past_races[:3]:
-            corner_position = race.get('コーナー通過順', '')
-            
-            if corner_position:
-                try:
-                    first_position = int(corner_position.split('-')[0])
-                    
-                    if first_position <= 3:
-                        front_runner_count += 1
-                    elif first_position >= 8:
-                        closer_count += 1
-                except:
-                    pass
-        
+    # 1. 脚質判定（7点）
+    if stats['n'] > 0:
         # 脚質判定
-        if front_runner_count >= 2:
+        if stats['front3'] >= 2:
             score += 7  # 逃げ・先行
-        elif closer_count >= 2:
+        elif stats['closer3'] >= 2:
             score += 7  # 差し・追込
         else:
             score += 3  # 汎用
@@ -464,26 +546,36 @@ def calculate_race_style_score(horse, race_info):
 # ====================================================================
 # 総合スコア計算
 # ====================================================================
-def calculate_des_score(horse, race_info):
+def calculate_des_score(horse, race_info, race_ctx=None, stats=None):
     """
     DES総合スコアを計算
     
     Args:
         horse (dict): 馬データ
         race_info (dict): レース情報
+        race_ctx (dict): build_race_context() の判定条件（省略時はここで作成）
+        stats (dict): _gather_stats() の集計値（省略時はここで集計）
     
     Returns:
         dict: des_score（A～D + total + 信頼度）
     """
-    a_score = calculate_past_performance_score(horse, race_info)
-    b_score = calculate_pedigree_score(horse, race_info)
-    c_score = calculate_jockey_trainer_score(horse, race_info)
-    d_score = calculate_race_style_score(horse, race_info)
+    if race_ctx is None:
+        race_ctx = build_race_context(race_info)
+    
+    # 過去走の集計は1回だけ行い、4軸で共有する
+    if stats is None:
+        stats = _gather_stats(horse, race_ctx)
+    
+    a_score = calculate_past_performance_score(horse, race_info, stats)
+    b_score = calculate_pedigree_score(horse, race_info, stats)
+    c_score = calculate_jockey_trainer_score(horse, race_info, stats)
+    d_score = calculate_race_style_score(horse, race_info, stats)
     
     total = a_score + b_score + c_score + d_score
     rescue_score = 0.0
-    if not horse.get('past_races', []):
-        rescue_score = calculate_missing_data_rescue_score(horse, race_info)
+    has_past_races = stats['n'] > 0
+    if not has_past_races:
+        rescue_score = calculate_missing_data_rescue_score(horse, race_info, race_ctx)
         total += rescue_score
     
     # 信頼度判定
@@ -502,7 +594,7 @@ def calculate_des_score(horse, race_info):
         "C_騎手厩舎": c_score,
         "D_展開適性": d_score,
         "救済スコア": rescue_score,
-        "データ不足フラグ": not bool(horse.get('past_races', [])),
+        "データ不足フラグ": not has_past_races,
         "total": round(total, 1),
         "信頼度": confidence
     }
@@ -511,25 +603,58 @@ def calculate_des_score(horse, race_info):
 # ====================================================================
 # メイン処理
 # ====================================================================
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python calculate_des_score.py YYYYMMDD")
-        sys.exit(1)
+def score_race(race):
+    """
+    1レース分の全馬について脚質推定とDESスコア計算を行う
+    
+    Args:
+        race (dict): レースデータ（各馬に推定脚質・des_scoreを追加する）
+    
+    Returns:
+        tuple: (race, 脚質構成の頭数リスト（_STYLES の順）)
+    """
+    style_counts = [0] * len(_STYLES)
+    
+    # 距離・トラックはレース内で共通なので1回だけ取り出す
+    race_ctx = build_race_context(race)
+    
+    for horse in race.get("horses", []):
+        # 過去走は1回だけ走査し、脚質推定とDESスコア計算で共有する
+        stats = _gather_stats(horse, race_ctx)
+        
+        # 脚質推定
+        running_style = running_style_from_votes(stats['style_votes'])
+        horse["推定脚質"] = running_style
+        style_counts[_STYLE_IDX[running_style]] += 1
+        
+        # DESスコア計算
+        horse["des_score"] = calculate_des_score(horse, race, race_ctx, stats)
     
-    ymd = sys.argv[1]
+    return race, style_counts
+
+
+def process_date(ymd, compact=False, quiet=False, executor=None):
+    """
+    1日分の race_data_{ymd}.json のDESスコアを計算して上書き保存する
+    
+    Args:
+        ymd (str): 対象日 YYYYMMDD
+        compact (bool): Trueならインデントなしで保存する
+        quiet (bool): Trueならレースごとのログを出力しない
+        executor: レースを並列処理するプロセスプール（Noneなら逐次処理）
+    
+    Returns:
+        bool: 処理できればTrue、入力ファイルが無ければFalse
+    """
     input_file = f"race_data_{ymd}.json"
     
     if not Path(input_file).exists():
         print(f"[ERROR] {input_file} が見つかりません")
-        sys.exit(1)
+        return False
     
-    # バックアップ作成
     backup_file = f"race_data_{ymd}.json.des_bak"
-    shutil.copy(input_file, backup_file)
-    print(f"[INFO] バックアップを作成しました: {backup_file}")
     
-    with open(input_file, "r", encoding="utf-8") as f:
-        race_data = json.load(f)
+    race_data = load_json(input_file)
     
     print(f"[INFO] {input_file} を読み込みました")
     print(f"[INFO] DESスコア計算開始: {len(race_data.get('races', []))}レース")
@@ -540,30 +665,24 @@ def main():
     rescue_applied_count = 0
     missing_past_races_count = 0
     
-    # 各レースを処理
-    for race in race_data["races"]:
+    # 各レースを処理（レース間は独立しているので並列化できる）
+    races = race_data["races"]
+    if executor is not None and len(races) > 2:
+        scored_races = list(executor.map(score_race, races, chunksize=4))
+        race_data["races"] = [race for race, _ in scored_races]
+    else:
+        scored_races = [score_race(race) for race in races]
+    
+    for race, style_counts in scored_races:
         race_id = race["race_id"]
         race_name = race.get("レース名", "不明")
         
-        print(f"\n🏇 {race_name} ({race_id}): {len(race.get('horses', []))}頭")
-        
-        # 脚質構成を計算
-        running_styles = {"逃げ": 0, "先行": 0, "差し": 0, "追込": 0, "不明": 0}
+        # レース単位でログをまとめて出力する
+        lines = [f"\n🏇 {race_name} ({race_id}): {len(race.get('horses', []))}頭"]
         
-        # 各馬のDESスコアを計算
         for horse in race.get("horses", []):
             horse_name = horse.get('馬名', '不明')
-            
-            # 脚質推定
-            running_style = estimate_running_style(horse.get('past_races', []))
-            horse["推定脚質"] = running_style
-            running_styles[running_style] += 1
-            
-            # DESスコア計算
-            des_score = calculate_des_score(horse, race)
-            
-            # 馬データに追加
-            horse["des_score"] = des_score
+            des_score = horse["des_score"]
             
             if des_score.get("データ不足フラグ"):
                 missing_past_races_count += 1
@@ -573,26 +692,57 @@ def main():
             total_horses += 1
             calculated_count += 1
             
-            print(f"  {horse.get('馬番', '?')}番 {horse_name}: {des_score['total']:.1f}点 ({des_score['信頼度']})")
+            lines.append(f"  {horse.get('馬番', '?')}番 {horse_name}: {des_score['total']:.1f}点 ({des_score['信頼度']})")
         
         # 脚質構成の表示
-        print(f"  脚質構成: {'逃げ' if running_styles['逃げ'] > 0 else ''}{running_styles['逃げ']} "
-              f"{'先行' if running_styles['先行'] > 0 else ''}{running_styles['先行']} "
-              f"{'差し' if running_styles['差し'] > 0 else ''}{running_styles['差し']} "
-              f"{'追込' if running_styles['追込'] > 0 else ''}{running_styles['追込']}")
-        print(f"  予想ペース: {'スロー' if running_styles['逃げ'] + running_styles['先行'] <= 2 else 'ハイペース'}")
+        style_summary = " ".join(
+            f"{style}{count}" for style, count in zip(_STYLES[:4], style_counts) if count
+        )
+        lines.append(f"  脚質構成: {style_summary}")
+        lines.append(f"  予想ペース: {'スロー' if style_counts[0] + style_counts[1] <= 2 else 'ハイペース'}")
+        
+        if not quiet:
+            sys.stdout.write("\n".join(lines) + "\n")
     
     # 結果を保存
-    print(f"\n✅ 完了: race_data_{ymd}.json を更新しました")
-    
-    with open(input_file, "w", encoding="utf-8") as f:
-        json.dump(race_data, f, ensure_ascii=False, indent=2)
-    
+    # 一時ファイルに書き出してから差し替え、元ファイルはそのままバックアップにする
+    tmp_file = f"{input_file}.tmp"
+    save_json(race_data, tmp_file, compact=compact)
+    os.replace(input_file, backup_file)
+    os.replace(tmp_file, input_file)
+    
+    print(f"\n[INFO] バックアップを作成しました: {backup_file}")
+    print(f"✅ 完了: race_data_{ymd}.json を更新しました")
     print(f"   - 対象レース数: {len(race_data.get('races', []))}")
     print(f"   - 対象馬数: {total_horses}")
     print(f"   - DESスコア計算完了: {calculated_count}")
     print(f"   - past_races不足馬数: {missing_past_races_count}")
     print(f"   - 救済スコア適用馬数: {rescue_applied_count}")
+    
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='race_data_{ymd}.json のDESスコアを計算する')
+    parser.add_argument('ymd', nargs='+', help='対象日 YYYYMMDD（複数指定可）')
+    parser.add_argument('--compact', action='store_true', help='インデントなしで保存する')
+    parser.add_argument('--quiet', action='store_true', help='レースごとのログを出力しない')
+    parser.add_argument('--jobs', type=int, default=1, help='レースを並列処理するプロセス数')
+    args = parser.parse_args()
+    
+    # 複数日を1プロセスで処理し、プロセスプールも日をまたいで使い回す
+    executor = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    try:
+        failed = [
+            ymd for ymd in args.ymd
+            if not process_date(ymd, compact=args.compact, quiet=args.quiet, executor=executor)
+        ]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
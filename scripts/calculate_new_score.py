@@ -22,8 +22,49 @@
 
 import json
 import sys
+from bisect import bisect_left
+from itertools import chain
 from typing import Dict, Any
 
+from json_io import load_json, save_json
+
+# ===== Phase1重み =====
+# 前走人気:    0.30 (+5%)
+# 騎手厩舎:    0.25 (+10%)
+# 距離馬場適性: 0.20 (+10%)
+# 脚質:        0.10 (+5%)
+# 馬体重増減:  0.10 (-20%)
+# 経験値:      0.05 (-10%)
+# 合計:        1.00
+# 加算順は従来の式と同じなので合計値も変わらない
+SCORE_WEIGHTS = (
+    ("当日人気", 0.30),  # Phase2修正: 当日人気優先
+    ("騎手厩舎", 0.25),
+    ("距離馬場適性", 0.20),
+    ("脚質", 0.10),
+    ("馬体重増減", 0.10),
+    ("経験値", 0.05),
+)
+
+# ===== 各要素のスコア表 =====
+# 馬体重増減: 境界値 -10 / -5 / 0 / 5 で区切った5区間（各区間は上端を含む）
+WEIGHT_CHANGE_BOUNDS = (-10, -5, 0, 5)
+WEIGHT_CHANGE_SCORES = (100, 80, 60, 40, 20)
+
+# 人気: 1〜10番人気は表で引き、それ以外は30点
+POPULARITY_SCORES = (30, 100, 90, 70, 70, 70, 50, 50, 50, 50, 50)
+
+# 経験値: 過去走数（5走以上は5走扱い）
+EXPERIENCE_SCORES = (20, 40, 60, 80, 80, 100)
+
+# 脚質: 逃げ33.3% > 先行26.7% > 差し40.0%（逃げ・先行が有利）
+LEG_TYPE_SCORES = {
+    "逃げ": 100,
+    "先行": 85,
+    "差し": 70,
+    "追込": 50,
+}
+
 def calculate_weight_change_score(weight_change: float) -> int:
     """
     馬体重増減スコア計算（10%の重み ← Phase1: 30%→10%）
@@ -32,16 +73,7 @@ def calculate_weight_change_score(weight_change: float) -> int:
     if weight_change is None:
         return 50  # データなしはニュートラル
     
-    if weight_change <= -10:
-        return 100
-    elif -10 < weight_change <= -5:
-        return 80
-    elif -5 < weight_change <= 0:
-        return 60
-    elif 0 < weight_change <= 5:
-        return 40
-    else:
-        return 20
+    return WEIGHT_CHANGE_SCORES[bisect_left(WEIGHT_CHANGE_BOUNDS, weight_change)]
 
 def calculate_popularity_score(last_popularity: str) -> int:
     """
@@ -53,34 +85,21 @@ def calculate_popularity_score(last_popularity: str) -> int:
     
     try:
         pop = int(last_popularity)
-        if pop == 1:
-            return 100
-        elif pop == 2:
-            return 90
-        elif 3 <= pop <= 5:
-            return 70
-        elif 6 <= pop <= 10:
-            return 50
-        else:
-            return 30
     except (ValueError, TypeError):
         return 50
+    
+    if 0 <= pop < len(POPULARITY_SCORES):
+        return POPULARITY_SCORES[pop]
+    return 30
 
 def calculate_experience_score(past_races_count: int) -> int:
     """
     経験値スコア計算（5%の重み ← Phase1: 15%→5%）
     入賞馬は平均3.6レース、不入賞馬は2.65レース
     """
-    if past_races_count >= 5:
-        return 100
-    elif past_races_count >= 3:
-        return 80
-    elif past_races_count == 2:
-        return 60
-    elif past_races_count == 1:
-        return 40
-    else:
-        return 20
+    if past_races_count < 0:
+        return EXPERIENCE_SCORES[0]
+    return EXPERIENCE_SCORES[min(past_races_count, 5)]
 
 def calculate_jockey_stable_score(des_jockey_stable: float) -> int:
     """
@@ -113,13 +132,7 @@ def calculate_leg_type_score(leg_type: str) -> int:
     脚質スコア計算（10%の重み ← Phase1: 5%→10%）
     逃げ33.3% > 先行26.7% > 差し40.0%（逃げ・先行が有利）
     """
-    leg_scores = {
-        "逃げ": 100,
-        "先行": 85,
-        "差し": 70,
-        "追込": 50,
-    }
-    return leg_scores.get(leg_type, 60)  # 不明は60点
+    return LEG_TYPE_SCORES.get(leg_type, 60)  # 不明は60点
 
 def calculate_new_score(horse: Dict[str, Any]) -> tuple[float, Dict[str, int]]:
     """
@@ -152,36 +165,20 @@ def calculate_new_score(horse: Dict[str, Any]) -> tuple[float, Dict[str, int]]:
         # fetch_shutuba.py が horse["人気"] に当日の人気を格納しているため優先使用
         last_popularity = horse.get("人気") or last_race.get("人気")
     
+    des_score = horse.get("des_score", {})
+    
     # 各要素のスコア計算
     score_components = {
         "馬体重増減": calculate_weight_change_score(weight_change),
         "当日人気": calculate_popularity_score(last_popularity),  # Phase2修正: 当日人気優先
         "経験値": calculate_experience_score(len(past_races)),
-        "騎手厩舎": calculate_jockey_stable_score(
-            horse.get("des_score", {}).get("C_騎手厩舎", 0)
-        ),
-        "距離馬場適性": calculate_aptitude_score(
-            horse.get("des_score", {}).get("B_距離馬場適性", 0)
-        ),
+        "騎手厩舎": calculate_jockey_stable_score(des_score.get("C_騎手厩舎", 0)),
+        "距離馬場適性": calculate_aptitude_score(des_score.get("B_距離馬場適性", 0)),
         "脚質": calculate_leg_type_score(horse.get("推定脚質", "")),
     }
     
-    # ===== Phase1重み =====
-    # 前走人気:    0.30 (+5%)
-    # 騎手厩舎:    0.25 (+10%)
-    # 距離馬場適性: 0.20 (+10%)
-    # 脚質:        0.10 (+5%)
-    # 馬体重増減:  0.10 (-20%)
-    # 経験値:      0.05 (-10%)
-    # 合計:        1.00
-    total_score = (
-        score_components["当日人気"]     * 0.30 +  # Phase2修正: 当日人気優先
-        score_components["騎手厩舎"]     * 0.25 +
-        score_components["距離馬場適性"] * 0.20 +
-        score_components["脚質"]         * 0.10 +
-        score_components["馬体重増減"]   * 0.10 +
-        score_components["経験値"]       * 0.05
-    )
+    # 重み付き合計（SCORE_WEIGHTS の順に加算）
+    total_score = sum(score_components[key] * weight for key, weight in SCORE_WEIGHTS)
     
     return round(total_score, 2), score_components
 
@@ -195,26 +192,26 @@ def main():
     
     try:
         # データ読み込み
-        with open(input_file, "r", encoding="utf-8") as f:
-            race_data = json.load(f)
+        race_data = load_json(input_file)
         
         print(f"[INFO] {input_file} を読み込みました")
         
-        # 各レースの各馬に新スコアを計算
+        # 全レースの馬を1本の列として取り出し、各馬に新スコアを計算
+        all_horses = chain.from_iterable(
+            race.get("horses", []) for race in race_data.get("races", [])
+        )
         total_horses = 0
-        for race in race_data.get("races", []):
-            for horse in race.get("horses", []):
-                new_score, score_components = calculate_new_score(horse)
-                
-                # 新スコアを追加
-                horse["新スコア"] = new_score
-                horse["新スコア_内訳"] = score_components
-                
-                total_horses += 1
+        for horse in all_horses:
+            new_score, score_components = calculate_new_score(horse)
+            
+            # 新スコアを追加（馬のdictはレース内のものなのでそのまま書き戻される）
+            horse["新スコア"] = new_score
+            horse["新スコア_内訳"] = score_components
+            
+            total_horses += 1
         
         # 結果を上書き保存
-        with open(input_file, "w", encoding="utf-8") as f:
-            json.dump(race_data, f, ensure_ascii=False, indent=2)
+        save_json(race_data, input_file)
         
         print(f"[SUCCESS] 新スコアを計算しました: {total_horses}頭")
         print(f"[SUCCESS] {input_file} に保存しました")
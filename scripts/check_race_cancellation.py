@@ -6,18 +6,35 @@ check_race_cancellation.py - レース開催中止情報の取得
 netkeibaから開催中止情報を取得し、JSON形式で出力する
 """
 
+import json
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
-from datetime import datetime
-from zoneinfo import ZoneInfo
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+
+# netkeiba への接続は使い回す（ハンドシェイクは1回、接続エラー時は短い間隔で再試行）
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
+# 中止系キーワード（「開催中止」「開催取りやめ」もこのいずれかを含む）
+_CANCEL_RE = re.compile(r'中止|取りやめ|取り止め')
+
+# 中央競馬場名（返却時はこの順に並べる）
+VENUE_KEYWORDS = ('東京', '京都', '阪神', '中山', '小倉', '新潟', '福島', '中京', '札幌', '函館')
+
+# 先読みでタイトル中の場名を1回の走査で拾う（「東京都」の東京・京都のような重なりも両方拾う）
+_VENUE_RE = re.compile('(?=(' + '|'.join(VENUE_KEYWORDS) + '))')
 
 
 def http_get(url: str, timeout=20) -> str:
     """HTTP GET リクエスト"""
     headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(url, headers=headers, timeout=timeout)
+    r = _SESSION.get(url, headers=headers, timeout=timeout)
     r.raise_for_status()
     return r.text
 
@@ -37,7 +54,16 @@ def check_cancellation_news(ymd: str) -> dict:
     
     try:
         html = http_get(url)
-        soup = BeautifulSoup(html, 'html.parser')
+        
+        # ページのどこにも中止系キーワードが無ければ記事タイトルにも無いので、解析せずに終える
+        if not _CANCEL_RE.search(html):
+            return {"is_cancelled": False, "date": ymd}
+        
+        # bs4 はキーワードがあった時だけ読み込む（通常日は import 自体を省く）
+        from bs4 import BeautifulSoup, SoupStrainer
+        
+        # ニュース一覧はこのdivの中だけを見るので、解析対象もここに絞る
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('div', class_='news_list'))
         
         # ニュース記事を検索
         articles = soup.find_all('div', class_='news_list')
@@ -73,11 +99,8 @@ def check_cancellation_news(ymd: str) -> dict:
                             reason = "馬場不良のため"
                         
                         # 競馬場を抽出
-                        venues = []
-                        venue_keywords = ['東京', '京都', '阪神', '中山', '小倉', '新潟', '福島', '中京', '札幌', '函館']
-                        for venue in venue_keywords:
-                            if venue in title:
-                                venues.append(venue)
+                        found = set(_VENUE_RE.findall(title))
+                        venues = [venue for venue in VENUE_KEYWORDS if venue in found]
                         
                         return {
                             "is_cancelled": True,
@@ -109,6 +132,12 @@ def check_race_list_page(ymd: str) -> dict:
     
     try:
         html = http_get(url)
+        
+        # 「開催中止」も「中止」を含むので、生のHTMLに「中止」が無ければ解析せずに終える
+        if '中止' not in html:
+            return {"is_cancelled": False, "date": ymd}
+        
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
         
         # 「開催中止」「中止」などのテキストを検索
@@ -146,19 +175,21 @@ def check_race_list_page(ymd: str) -> dict:
         return {"is_cancelled": False, "date": ymd, "error": str(e)}
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python check_race_cancellation.py YYYYMMDD")
-        sys.exit(1)
-    
-    ymd = sys.argv[1]
+def _report_cancellation(ymd, news_future, list_future):
+    """
+    ニュース → レース一覧ページの順に結果を確認し、cancellation_info_{ymd}.json を出力
     
-    print(f"📅 対象日付: {ymd}")
-    print("=" * 60)
+    Args:
+        ymd (str): 対象日付（YYYYMMDD）
+        news_future: check_cancellation_news() の Future
+        list_future: check_race_list_page() の Future
     
+    Returns:
+        int: 終了コード
+    """
     # ニュースから確認
     print("\n🔍 ニュースから開催中止情報を確認中...")
-    news_result = check_cancellation_news(ymd)
+    news_result = news_future.result()
     
     if news_result.get('is_cancelled'):
         print(f"✅ 開催中止を検出:")
@@ -167,7 +198,6 @@ def main():
         print(f"   タイトル: {news_result['title']}")
         print(f"   リンク: {news_result['link']}")
         
-        import json
         output = {
             "date": ymd,
             "is_cancelled": True,
@@ -182,18 +212,19 @@ def main():
             json.dump(output, f, ensure_ascii=False, indent=2)
         
         print(f"\n✅ cancellation_info_{ymd}.json を作成しました")
+        # ニュースで確定したのでレース一覧ページの結果は使わない
+        list_future.cancel()
         return 0
     
     # レース一覧ページから確認
     print("\n🔍 レース一覧ページから確認中...")
-    list_result = check_race_list_page(ymd)
+    list_result = list_future.result()
     
     if list_result.get('is_cancelled'):
         print(f"✅ 開催中止を検出:")
         print(f"   理由: {list_result['reason']}")
         print(f"   情報: {list_result.get('info', '')}")
         
-        import json
         output = {
             "date": ymd,
             "is_cancelled": True,
@@ -211,7 +242,6 @@ def main():
     # 開催中止なし
     print("\n✅ 開催中止の情報は見つかりませんでした")
     
-    import json
     output = {
         "date": ymd,
         "is_cancelled": False
@@ -224,6 +254,26 @@ def main():
     return 0
 
 
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python check_race_cancellation.py YYYYMMDD")
+        sys.exit(1)
+    
+    ymd = sys.argv[1]
+    
+    print(f"📅 対象日付: {ymd}")
+    print("=" * 60)
+    
+    # 2つの確認は独立しているので、通信を並行して待つ（判定はニュース優先のまま）
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        news_future = executor.submit(check_cancellation_news, ymd)
+        list_future = executor.submit(check_race_list_page, ymd)
+        return _report_cancellation(ymd, news_future, list_future)
+    finally:
+        executor.shutdown(wait=False)
+
+
 if __name__ == "__main__":
     try:
         sys.exit(main())
@@ -8,10 +8,14 @@ daily_select.py - 当日のrace_idを自動取得（中央/地方両対応版）
 
 import sys
 import re
-import json
 import requests
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from json_io import dumps, save_json
 
 # 中央競馬（JRA）場コード → 場名のマッピング
 JRA_VENUE_MAP = {
@@ -46,64 +50,109 @@ NAR_VENUE_MAP = {
     "65": "帯広ば"
 }
 
+# 祝日（簡易版：主要祝日のみ）
+HOLIDAYS_2026 = frozenset({
+    "20260101",  # 元日
+    "20260113",  # 成人の日
+    "20260211",  # 建国記念の日
+    "20260223",  # 天皇誕生日
+    "20260320",  # 春分の日
+    "20260429",  # 昭和の日
+    "20260503",  # 憲法記念日
+    "20260504",  # みどりの日
+    "20260505",  # こどもの日
+    "20260720",  # 海の日
+    "20260811",  # 山の日
+    "20260921",  # 敬老の日
+    "20260923",  # 秋分の日
+    "20261012",  # 体育の日
+    "20261103",  # 文化の日
+    "20261123",  # 勤労感謝の日
+})
+
+# 曜日名（date.weekday() の 0=月曜 に対応）
+WEEKDAY_NAMES = ("月", "火", "水", "木", "金", "土", "日")
+
 RACE_ID_RE = re.compile(r"race_id=(\d{12})")
 
+# 0件時の休催理由判定（メンテナンスを優先、英字は大文字小文字を区別しない）
+MAINTENANCE_RE = re.compile(r"メンテナンス|システム|maintenance", re.IGNORECASE)
+CLOSED_RE = re.compile(r"休止|休催")
+
+# 日本標準時（夏時間が無い固定オフセットなので tz データベースは読まない）
+JST = timezone(timedelta(hours=9))
+
+# netkeiba への接続は使い回す（ハンドシェイクは1回、接続エラー時は短い間隔で再試行）
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
 def http_get(url: str, timeout=20) -> str:
     """HTTP GET リクエスト"""
     headers = {"User-Agent": "Mozilla/5.0"}
-    r = requests.get(url, headers=headers, timeout=timeout)
+    r = _SESSION.get(url, headers=headers, timeout=timeout)
     
-    print(f"📡 fetch_url: {url}")
-    print(f"📊 status: {r.status_code}")
-    print(f"📏 len: {len(r.text)}")
+    # r.text は参照のたびにデコードし直すので1回だけ取り出す
+    # ログは1行にまとめる（並行取得時に他URLの行と混ざらないように）
+    text = r.text
+    print(f"📡 fetch_url: {url} (status: {r.status_code}, len: {len(text)})")
     
     r.raise_for_status()
-    return r.text
+    return text
 
-def is_weekend_or_holiday(date_obj):
+def is_weekend_or_holiday(date_obj, ymd=None):
     """
     土日祝の判定
     - 土曜日: weekday() == 5
     - 日曜日: weekday() == 6
     - 祝日: 簡易実装（後で拡張可能）
+    ymd（YYYYMMDD）を渡せば祝日判定で日付を文字列に戻さずに済む
     """
     # 土日判定
     if date_obj.weekday() >= 5:
         return True
     
     # 祝日判定（簡易版：主要祝日のみ）
-    holidays_2026 = [
-        "20260101",  # 元日
-        "20260113",  # 成人の日
-        "20260211",  # 建国記念の日
-        "20260223",  # 天皇誕生日
-        "20260320",  # 春分の日
-        "20260429",  # 昭和の日
-        "20260503",  # 憲法記念日
-        "20260504",  # みどりの日
-        "20260505",  # こどもの日
-        "20260720",  # 海の日
-        "20260811",  # 山の日
-        "20260921",  # 敬老の日
-        "20260923",  # 秋分の日
-        "20261012",  # 体育の日
-        "20261103",  # 文化の日
-        "20261123",  # 勤労感謝の日
-    ]
-    
-    ymd_str = date_obj.strftime("%Y%m%d")
-    return ymd_str in holidays_2026
+    ymd_str = ymd or date_obj.strftime("%Y%m%d")
+    return ymd_str in HOLIDAYS_2026
 
 def race_no_from_race_id(race_id: str):
     """race_idの末尾2桁からレース番号を取得"""
+    return _race_no_from_suffix(race_id[-2:])
+
+@lru_cache(maxsize=128)
+def _race_no_from_suffix(suffix: str):
+    """末尾2桁 → レース番号（"01"〜"12" 程度しか現れないのでキャッシュする）"""
     try:
-        n = int(race_id[-2:])
+        n = int(suffix)
         if 1 <= n <= 12:
             return n
     except Exception:
         pass
     return None
 
+def extract_race_ids(html: str, venue_map: dict) -> list:
+    """
+    HTMLから指定した場コードのrace_idを出現順・重複なしで取り出す
+    （findall → dict.fromkeys → フィルタの3段階を1回の走査にまとめたもの）
+    """
+    # race_idリンクが1件も無いページ（休催日など）は正規表現を走らせない
+    if 'race_id=' not in html:
+        return []
+    
+    seen = set()
+    race_ids = []
+    for m in RACE_ID_RE.finditer(html):
+        rid = m.group(1)
+        if rid in seen:
+            continue
+        seen.add(rid)
+        if rid[4:6] in venue_map:
+            race_ids.append(rid)
+    return race_ids
+
 def get_venue_name(race_id: str) -> tuple:
     """
     race_idから競馬場情報を取得
@@ -123,6 +172,11 @@ def get_venue_name(race_id: str) -> tuple:
     
     return 'UNKNOWN', f"場コード{jyo_code}"
 
+@lru_cache(maxsize=8)
+def _parse_ymd(ymd: str) -> datetime:
+    """YYYYMMDD → datetime（同じ日付で何度も呼ばれるのでキャッシュする）"""
+    return datetime.strptime(ymd, "%Y%m%d")
+
 def validate_race_id(race_id: str, target_ymd: str) -> bool:
     """
     race_idが指定日付のレースか確認
@@ -132,21 +186,13 @@ def validate_race_id(race_id: str, target_ymd: str) -> bool:
     
     NARの場合、位置6:8が月、位置8:10が日
     """
-    from datetime import datetime
-    
-    NAR_VENUE_MAP = {
-        '30': '門別', '35': '盛岡', '36': '水沢', '42': '浦和', '43': '船橋',
-        '44': '大井', '45': '川崎', '46': '金沢', '47': '笠松', '48': '名古屋',
-        '50': '園田', '51': '姫路', '54': '高知', '55': '佐賀', '65': '帯広ば'
-    }
-    
     try:
         venue_code = race_id[4:6]
-        target_date = datetime.strptime(target_ymd, "%Y%m%d")
+        target_date = _parse_ymd(target_ymd)
         race_year = int(race_id[:4])
         
         # 年が一致するか確認
-        if abs(race_year - target_date.year) > 0:
+        if race_year != target_date.year:
             return False
         
         # NARの場合、位置6:8が月、位置8:10が日
@@ -154,6 +200,7 @@ def validate_race_id(race_id: str, target_ymd: str) -> bool:
             race_month = int(race_id[6:8])
             race_day = int(race_id[8:10])
             
+            # 月・日は一覧ページに前後の開催日が混ざっても落とさないよう幅を持たせる
             # 月が一致するか確認
             if abs(race_month - target_date.month) > 1:
                 return False
@@ -172,69 +219,54 @@ def validate_race_id(race_id: str, target_ymd: str) -> bool:
         print(f"⚠️ race_id validation error: {e}")
         return False
 
-def fetch_jra_races(ymd: str) -> tuple:
+def extract_valid_race_ids(html: str, venue_map: dict, ymd: str) -> list:
     """
-    中央競馬（JRA）のrace_idを取得
-    返り値: (races_by_jyo, race_ids, race_list)
+    HTMLから指定した場コードのrace_idを取り出し、対象日のものだけに絞る
+    （除外があった場合はその件数を表示する）
     """
-    # JRAのレース一覧ページ
-    # 注意: 複数のURLを試行
-    
-    urls = [
-        f"https://race.netkeiba.com/top/race_list.html?kaisai_date={ymd}",
-        f"https://race.netkeiba.com/top/race_list_sub.html?kaisai_date={ymd}",
-        f"https://race.netkeiba.com/?pid=race_list&date={ymd}",
-    ]
+    # 抽出と日付検証を1回の走査で行う
+    valid_race_ids = []
+    invalid_count = 0
+    for rid in extract_race_ids(html, venue_map):
+        if validate_race_id(rid, ymd):
+            valid_race_ids.append(rid)
+        else:
+            invalid_count += 1
     
-    for url in urls:
-        try:
-            html = http_get(url)
-            
-            # race_id 抽出（12桁）
-            race_ids = list(dict.fromkeys(RACE_ID_RE.findall(html)))
-            
-            # JRAのrace_idのみフィルタ（場コード01-10）
-            jra_race_ids = [rid for rid in race_ids if rid[4:6] in JRA_VENUE_MAP]
-            
-            # 日付検証
-            valid_race_ids = [rid for rid in jra_race_ids if validate_race_id(rid, ymd)]
-            
-            if len(jra_race_ids) != len(valid_race_ids):
-                print(f"⚠️ 無効なrace_idを除外: {len(jra_race_ids) - len(valid_race_ids)}件")
-            
-            if valid_race_ids:
-                print(f"✅ JRA: {len(valid_race_ids)} races found")
-                jra_race_ids = valid_race_ids
-                break
-        except Exception as e:
-            print(f"⚠️ JRA fetch failed for {url}: {e}")
-            continue
-    else:
-        print(f"❌ JRA: No races found")
-        return {}, [], []
+    if invalid_count:
+        print(f"⚠️ 無効なrace_idを除外: {invalid_count}件")
     
+    return valid_race_ids
+
+def group_race_ids(race_ids: list) -> tuple:
+    """
+    race_idを場ごとに分類し、後続スクリプト用のリストも作る
+    返り値: (races_by_jyo, race_list)
+    """
     # 場ごとに分類
     races_by_jyo = {}
     race_list = []
     
-    for rid in jra_race_ids:
+    for rid in race_ids:
         jyo_cd = rid[4:6]
         rno = race_no_from_race_id(rid)
         
         if rno is None:
             continue
         
-        venue_type, venue_name = get_venue_name(rid)
-        
-        # 場別集計用
-        if jyo_cd not in races_by_jyo:
-            races_by_jyo[jyo_cd] = {
+        # 場別集計用（場名・種別の判定は場ごとに1回だけ）
+        venue = races_by_jyo.get(jyo_cd)
+        if venue is None:
+            venue_type, venue_name = get_venue_name(rid)
+            venue = races_by_jyo[jyo_cd] = {
                 "name": venue_name,
                 "type": venue_type,
                 "race_id_map": {}
             }
+        else:
+            venue_type, venue_name = venue["type"], venue["name"]
         
-        races_by_jyo[jyo_cd]["race_id_map"][rno] = rid
+        venue["race_id_map"][rno] = rid
         
         # 後続スクリプト用リスト
         race_list.append({
@@ -248,24 +280,79 @@ def fetch_jra_races(ymd: str) -> tuple:
             }
         })
     
-    return races_by_jyo, jra_race_ids, race_list
+    return races_by_jyo, race_list
 
-def fetch_nar_races(ymd: str) -> tuple:
+def fetch_jra_races(ymd: str) -> tuple:
     """
-    地方競馬（NAR）のrace_idを取得
+    中央競馬（JRA）のrace_idを取得
     返り値: (races_by_jyo, race_ids, race_list)
     """
-    url = f"https://nar.netkeiba.com/top/race_list_sub.html?kaisai_date={ymd}"
+    # JRAのレース一覧ページ
+    # 注意: 複数のURLを試行
     
+    urls = [
+        f"https://race.netkeiba.com/top/race_list.html?kaisai_date={ymd}",
+        f"https://race.netkeiba.com/top/race_list_sub.html?kaisai_date={ymd}",
+        f"https://race.netkeiba.com/?pid=race_list&date={ymd}",
+    ]
+    
+    # 候補URLは同時に取りに行き、判定は従来どおり先頭のURLから順に行う
+    executor = ThreadPoolExecutor(max_workers=len(urls))
+    futures = [executor.submit(http_get, url) for url in urls]
+    try:
+        for url, future in zip(urls, futures):
+            try:
+                html = future.result()
+                
+                # race_id 抽出（12桁）、JRAのrace_idのみ（場コード01-10）
+                valid_race_ids = extract_valid_race_ids(html, JRA_VENUE_MAP, ymd)
+                
+                if valid_race_ids:
+                    print(f"✅ JRA: {len(valid_race_ids)} races found")
+                    jra_race_ids = valid_race_ids
+                    break
+            except Exception as e:
+                print(f"⚠️ JRA fetch failed for {url}: {e}")
+                continue
+        else:
+            print(f"❌ JRA: No races found")
+            return {}, [], []
+    finally:
+        # 採用したURL以降の取得結果は使わないので待たない
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    races_by_jyo, race_list = group_race_ids(jra_race_ids)
+    return races_by_jyo, jra_race_ids, race_list
+
+def nar_race_list_url(ymd: str) -> str:
+    """地方競馬（NAR）のレース一覧ページURL"""
+    return f"https://nar.netkeiba.com/top/race_list_sub.html?kaisai_date={ymd}"
+
+@lru_cache(maxsize=8)
+def get_nar_race_list(ymd: str):
+    """
+    地方競馬（NAR）のレース一覧ページを取得（レスポンスはキャッシュする）
+    
+    レース取得と0件時の休催理由確認は同じページを見るので、2回目は通信しない。
+    エラー応答もそのまま返すので、ステータス確認は呼び出し側で行う。
+    """
     # NAR は Referer が必要
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Referer': 'https://nar.netkeiba.com/top/race_list.html'
     }
+    return _SESSION.get(nar_race_list_url(ymd), headers=headers, timeout=20)
+
+def fetch_nar_races(ymd: str) -> tuple:
+    """
+    地方競馬（NAR）のrace_idを取得
+    返り値: (races_by_jyo, race_ids, race_list)
+    """
+    url = nar_race_list_url(ymd)
     
     try:
         print(f"📡 NAR fetch_url: {url}")
-        r = requests.get(url, headers=headers, timeout=20)
+        r = get_nar_race_list(ymd)
         r.raise_for_status()
         html = r.text
         print(f"📊 NAR status: {r.status_code}, len: {len(html)}")
@@ -273,56 +360,12 @@ def fetch_nar_races(ymd: str) -> tuple:
         print(f"❌ NAR fetch failed: {e}")
         return {}, [], []
     
-    # race_id 抽出（12桁）
-    race_ids = list(dict.fromkeys(RACE_ID_RE.findall(html)))
-    
-    # NARのrace_idのみフィルタ（場コード11以上）
-    nar_race_ids = [rid for rid in race_ids if rid[4:6] in NAR_VENUE_MAP]
+    # race_id 抽出（12桁）、NARのrace_idのみ（場コード11以上）
+    nar_race_ids = extract_valid_race_ids(html, NAR_VENUE_MAP, ymd)
     
-    # 日付検証
-    valid_race_ids = [rid for rid in nar_race_ids if validate_race_id(rid, ymd)]
-    
-    if len(nar_race_ids) != len(valid_race_ids):
-        print(f"⚠️ 無効なrace_idを除外: {len(nar_race_ids) - len(valid_race_ids)}件")
-    
-    print(f"✅ NAR: {len(valid_race_ids)} races found")
-    nar_race_ids = valid_race_ids
-    
-    # 場ごとに分類
-    races_by_jyo = {}
-    race_list = []
-    
-    for rid in nar_race_ids:
-        jyo_cd = rid[4:6]
-        rno = race_no_from_race_id(rid)
-        
-        if rno is None:
-            continue
-        
-        venue_type, venue_name = get_venue_name(rid)
-        
-        # 場別集計用
-        if jyo_cd not in races_by_jyo:
-            races_by_jyo[jyo_cd] = {
-                "name": venue_name,
-                "type": venue_type,
-                "race_id_map": {}
-            }
-        
-        races_by_jyo[jyo_cd]["race_id_map"][rno] = rid
-        
-        # 後続スクリプト用リスト
-        race_list.append({
-            "race_id": rid,
-            "race_info": {
-                "venue": venue_name,
-                "venue_code": jyo_cd,
-                "venue_type": venue_type,
-                "race_no": rno,
-                "レース名": f"{rno}R"
-            }
-        })
+    print(f"✅ NAR: {len(nar_race_ids)} races found")
     
+    races_by_jyo, race_list = group_race_ids(nar_race_ids)
     return races_by_jyo, nar_race_ids, race_list
 
 def main():
@@ -331,15 +374,15 @@ def main():
         ymd = sys.argv[1]
         print(f"📅 指定された日付: {ymd}")
     else:
-        jst = ZoneInfo("Asia/Tokyo")
-        ymd = datetime.now(jst).strftime("%Y%m%d")
+        ymd = datetime.now(JST).strftime("%Y%m%d")
         print(f"📅 今日の日付（自動取得）: {ymd}")
     
     # 日付オブジェクトを作成（曜日判定用）
-    date_obj = datetime.strptime(ymd, "%Y%m%d")
-    is_weekend = is_weekend_or_holiday(date_obj)
+    # race_id の日付検証と同じキャッシュを使うので、解析はこの1回だけ
+    date_obj = _parse_ymd(ymd)
+    is_weekend = is_weekend_or_holiday(date_obj, ymd)
     
-    weekday_name = ["月", "火", "水", "木", "金", "土", "日"][date_obj.weekday()]
+    weekday_name = WEEKDAY_NAMES[date_obj.weekday()]
     
     print("=" * 60)
     print(f"📆 曜日: {weekday_name}曜日")
@@ -372,47 +415,56 @@ def main():
         # 平日：中央→地方の順
         print("\n🏇 平日モード: 中央→地方の順で取得")
         
-        # 中央競馬を取得
-        jra_races_by_jyo, jra_race_ids, jra_race_list = fetch_jra_races(ymd)
-        
-        all_races_by_jyo.update(jra_races_by_jyo)
-        all_race_ids.extend(jra_race_ids)
-        all_race_list.extend(jra_race_list)
-        
-        # 地方競馬を取得（中央がない場合、または追加取得）
-        print("\n🏇 地方競馬も取得")
-        nar_races_by_jyo, nar_race_ids, nar_race_list = fetch_nar_races(ymd)
+        # 地方は中央の結果に関係なく取得するので、通信だけ先に並行して始めておく
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            nar_future = executor.submit(fetch_nar_races, ymd)
+            
+            # 中央競馬を取得
+            jra_races_by_jyo, jra_race_ids, jra_race_list = fetch_jra_races(ymd)
+            
+            all_races_by_jyo.update(jra_races_by_jyo)
+            all_race_ids.extend(jra_race_ids)
+            all_race_list.extend(jra_race_list)
+            
+            # 地方競馬を取得（中央がない場合、または追加取得）
+            print("\n🏇 地方競馬も取得")
+            nar_races_by_jyo, nar_race_ids, nar_race_list = nar_future.result()
         
         all_races_by_jyo.update(nar_races_by_jyo)
         all_race_ids.extend(nar_race_ids)
         all_race_list.extend(nar_race_list)
     
-    # 開催場数とレース数を表示
-    print("\n" + "=" * 60)
-    print(f"✅ 開催場数: {len(all_races_by_jyo)}")
+    # 開催場数とレース数を表示（まとめて1回で出力する）
+    lines = ["\n" + "=" * 60, f"✅ 開催場数: {len(all_races_by_jyo)}"]
     
-    # JRAとNARを分けて表示
-    jra_venues = {k: v for k, v in all_races_by_jyo.items() if v.get('type') == 'JRA'}
-    nar_venues = {k: v for k, v in all_races_by_jyo.items() if v.get('type') == 'NAR'}
+    # JRAとNARを分けて表示（1回の走査で振り分ける）
+    jra_venues = {}
+    nar_venues = {}
+    for k, v in all_races_by_jyo.items():
+        venue_type = v.get('type')
+        if venue_type == 'JRA':
+            jra_venues[k] = v
+        elif venue_type == 'NAR':
+            nar_venues[k] = v
     
     if jra_venues:
-        print("\n🏇 中央競馬（JRA）:")
+        lines.append("\n🏇 中央競馬（JRA）:")
         for jyo_cd, data in sorted(jra_venues.items()):
-            print(f"  📍 {data['name']} ({jyo_cd}): {len(data['race_id_map'])}R")
+            lines.append(f"  📍 {data['name']} ({jyo_cd}): {len(data['race_id_map'])}R")
     
     if nar_venues:
-        print("\n🏇 地方競馬（NAR）:")
+        lines.append("\n🏇 地方競馬（NAR）:")
         for jyo_cd, data in sorted(nar_venues.items()):
-            print(f"  📍 {data['name']} ({jyo_cd}): {len(data['race_id_map'])}R")
+            lines.append(f"  📍 {data['name']} ({jyo_cd}): {len(data['race_id_map'])}R")
     
-    print(f"\n✅ 総レース数: {len(all_race_ids)}")
-    print("=" * 60)
+    lines.append(f"\n✅ 総レース数: {len(all_race_ids)}")
+    lines.append("=" * 60)
+    sys.stdout.write("\n".join(lines) + "\n")
     
     # JSON 出力（後続スクリプト用）
-    jst = ZoneInfo("Asia/Tokyo")
     output = {
         "date": ymd,
-        "generated_at": datetime.now(jst).isoformat(),
+        "generated_at": datetime.now(JST).isoformat(),
         "is_weekend": is_weekend,
         "weekday": weekday_name,
         "total_race_count": len(all_race_ids),
@@ -426,8 +478,7 @@ def main():
     
     # ファイル出力
     output_file = "today_jobs.latest.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    save_json(output, output_file)
     
     print(f"\n✅ {output_file} created")
     print(f"📊 race_ids: {len(all_race_ids)}件")
@@ -444,18 +495,14 @@ def main():
         
         # NARサイトにアクセスして休催理由を確認
         try:
-            nar_url = f"https://nar.netkeiba.com/top/race_list_sub.html?kaisai_date={ymd}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-                'Referer': 'https://nar.netkeiba.com/'
-            }
-            r = requests.get(nar_url, headers=headers, timeout=10)
-            nar_text = r.text.lower()
-            if 'メンテナンス' in r.text or 'maintenance' in nar_text or 'システム' in r.text:
+            # レース取得時と同じページなので、取得済みならキャッシュを使う
+            r = get_nar_race_list(ymd)
+            nar_text = r.text
+            if MAINTENANCE_RE.search(nar_text):
                 no_race_reason = "システムメンテナンスのため全地方競馬休催日"
                 no_race_type = "maintenance"
                 print("🔧 システムメンテナンスによる休催を検知")
-            elif '休止' in r.text or '休催' in r.text:
+            elif CLOSED_RE.search(nar_text):
                 no_race_reason = "本日は全競馬場が休催です"
                 no_race_type = "closed"
                 print("🚫 全場休催を検知")
@@ -463,10 +510,9 @@ def main():
             print(f"⚠️ 休催理由の確認に失敗: {e}")
         
         # latest_predictions.json を「開催なし」状態で更新
-        jst = ZoneInfo("Asia/Tokyo")
         no_race_data = {
             "ymd": ymd,
-            "generated_at": datetime.now(jst).strftime("%Y-%m-%d %H:%M:%S"),
+            "generated_at": datetime.now(JST).strftime("%Y-%m-%d %H:%M:%S"),
             "no_race": True,
             "no_race_type": no_race_type,
             "no_race_reason": no_race_reason,
@@ -480,13 +526,15 @@ def main():
             }
         }
         
-        with open("latest_predictions.json", "w", encoding="utf-8") as f:
-            json.dump(no_race_data, f, ensure_ascii=False, indent=2)
+        # 同じ内容を2ファイルに書くので、エンコードは1回だけ
+        payload = dumps(no_race_data)
+        with open("latest_predictions.json", "wb") as f:
+            f.write(payload)
         
         # 日付別ファイルも保存
         no_race_file = f"final_predictions_{ymd}.json"
-        with open(no_race_file, "w", encoding="utf-8") as f:
-            json.dump(no_race_data, f, ensure_ascii=False, indent=2)
+        with open(no_race_file, "wb") as f:
+            f.write(payload)
         
         print(f"✅ latest_predictions.json を「開催なし」状態で更新: {no_race_reason}")
         print(f"✅ {no_race_file} を作成")
@@ -7,15 +7,21 @@
 race_data_{ymd}.json に追加する
 """
 
-import json
+import gzip
 import re
 import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+
+from json_io import load_json, save_json
 
 # ====================================================================
 # 設定
@@ -26,8 +32,33 @@ USER_AGENT = (
     "Chrome/120.0.0.0 Safari/537.36"
 )
 
+# 1頭あたりに保存する過去走の数
+MAX_PAST_RACES = 5
+
+# 馬柱ページは <tr> の中だけを解析する（馬の行は HorseList、NARは一般trにフォールバックするので tr 全体を残す）
+PAST_PAGE_STRAINER = SoupStrainer("tr")
+
 # JRA場コード（中央競馬）
-JRA_VENUE_CODES = ["01", "02", "03", "04", "05", "06", "07", "08", "09", "10"]
+JRA_VENUE_CODES = frozenset({"01", "02", "03", "04", "05", "06", "07", "08", "09", "10"})
+
+# 馬柱ページはレースごとに同じホストへ取りに行くので接続を使い回す（一時的な5xxは短い間隔で再試行）
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = USER_AGENT
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+))
+
+# 馬柱ページの同時取得数と、リクエスト開始の最小間隔（秒）
+FETCH_WORKERS = 4
+REQUEST_INTERVAL = 1.0
+
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+# --cache 指定時の馬柱ページ保存先と有効期間（秒）。再実行時はここから読んで通信を省く
+PAGE_CACHE_DIR = Path(".cache/shutuba_past")
+PAGE_CACHE_TTL = 6 * 60 * 60
 
 # ====================================================================
 # URL判別関数
@@ -70,11 +101,7 @@ def http_get(url, encoding=None, timeout=10):
         None: 失敗時
     """
     try:
-        resp = requests.get(
-            url,
-            headers={"User-Agent": USER_AGENT},
-            timeout=timeout
-        )
+        resp = _SESSION.get(url, timeout=timeout)
         resp.raise_for_status()
 
         if encoding:
@@ -94,16 +121,77 @@ def http_get(url, encoding=None, timeout=10):
         return None
 
 
+def _wait_for_request_slot():
+    """
+    全スレッド共通で、リクエストの開始間隔を REQUEST_INTERVAL 秒以上あける
+    """
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        start_at = max(now, _next_request_at)
+        _next_request_at = start_at + REQUEST_INTERVAL
+    if start_at > now:
+        time.sleep(start_at - now)
+
+
+def fetch_paced(url):
+    """
+    レート制限（1リクエスト/REQUEST_INTERVAL秒）を守って http_get する
+    """
+    _wait_for_request_slot()
+    return http_get(url)
+
+
+def fetch_shutuba_past(race_id, url, use_cache=False):
+    """
+    馬柱ページを取得する
+    
+    Args:
+        race_id (str): 12桁のレースID（キャッシュのファイル名に使う）
+        url (str): 馬柱ページのURL
+        use_cache (bool): Trueなら PAGE_CACHE_DIR に gzip で保存し、PAGE_CACHE_TTL 内なら再利用する
+    
+    Returns:
+        str: HTML（失敗時は None）
+    """
+    cache_file = PAGE_CACHE_DIR / f"{race_id}.html.gz"
+    if use_cache and cache_file.exists() and time.time() - cache_file.stat().st_mtime < PAGE_CACHE_TTL:
+        return gzip.decompress(cache_file.read_bytes()).decode("utf-8")
+    
+    html = fetch_paced(url)
+    if use_cache and html:
+        PAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_bytes(gzip.compress(html.encode("utf-8")))
+    return html
+
+
 # ====================================================================
 # 馬柱ページ解析
 # ====================================================================
+# 1頭・1走ごとに何度も使うのでモジュール読み込み時に1回だけコンパイルしておく
+WHITESPACE_RE = re.compile(r"\s+")
+DATE_RE = re.compile(r"\d{4}\.\d{2}\.\d{2}")
+DATE_SPLIT_RE = re.compile(r"(?=\d{4}\.\d{2}\.\d{2})")
+DATE_VENUE_RE = re.compile(r"(\d{4}\.\d{2}\.\d{2})\s+([^\s]+)")
+RACE_NO_RE = re.compile(r"\b(\d{1,2})R\b")
+RACE_NO_FALLBACK_RE = re.compile(r"\d{4}\.\d{2}\.\d{2}\s+[^\s]+\s+(\d{1,2})\b")
+DISTANCE_RE = re.compile(r"(ダ|芝)(\d{3,4})")
+TIME_RE = re.compile(r"(\d:\d{2}\.\d)")
+FIELD_RE = re.compile(r"(\d+)頭\s+(\d+)番\s+(\d+)人")
+JOCKEY_RE = re.compile(r"\d+頭\s+\d+番\s+\d+人\s+([^\d\s][^\d]*?)\s+(\d{2}(?:\.\d)?)\b")
+CORNER_RE = re.compile(r"(\d+(?:-\d+){1,3})")
+LAST3F_WEIGHT_RE = re.compile(r"\((\d{2}\.\d)\)\s+(\d+\([+\-]?\d+\))")
+WEIGHT_RE = re.compile(r"(\d+\([+\-]?\d+\))")
+HORSE_ID_RE = re.compile(r"/horse/(\w+)")
+
+
 def _normalize_cell_text(text):
-    return re.sub(r"\s+", " ", text or "").strip()
+    return WHITESPACE_RE.sub(" ", text or "").strip()
 
 
 def _extract_past_race_from_text(text):
     text = _normalize_cell_text(text)
-    if not text or not re.search(r"\d{4}\.\d{2}\.\d{2}", text):
+    if not text or not DATE_RE.search(text):
         return None
 
     race = {
@@ -124,25 +212,25 @@ def _extract_past_race_from_text(text):
         "馬体重": ""
     }
 
-    m = re.search(r"(\d{4}\.\d{2}\.\d{2})\s+([^\s]+)", text)
+    m = DATE_VENUE_RE.search(text)
     if m:
         race["開催日"] = m.group(1)
         race["競馬場"] = m.group(2)
 
-    m = re.search(r"\b(\d{1,2})R\b", text)
+    m = RACE_NO_RE.search(text)
     if m:
         race["レース番号"] = m.group(1)
     else:
-        m = re.search(r"\d{4}\.\d{2}\.\d{2}\s+[^\s]+\s+(\d{1,2})\b", text)
+        m = RACE_NO_FALLBACK_RE.search(text)
         if m:
             race["レース番号"] = m.group(1)
 
-    m = re.search(r"(ダ|芝)(\d{3,4})", text)
+    m = DISTANCE_RE.search(text)
     if m:
         race["距離種別"] = m.group(1)
         race["距離"] = m.group(2)
 
-    m = re.search(r"(\d:\d{2}\.\d)", text)
+    m = TIME_RE.search(text)
     if m:
         race["タイム"] = m.group(1)
 
@@ -151,27 +239,27 @@ def _extract_past_race_from_text(text):
             race["馬場状態"] = cond
             break
 
-    m = re.search(r"(\d+)頭\s+(\d+)番\s+(\d+)人", text)
+    m = FIELD_RE.search(text)
     if m:
         race["頭数"] = m.group(1)
         race["枠番"] = m.group(2)
         race["人気"] = m.group(3)
 
-    m = re.search(r"\d+頭\s+\d+番\s+\d+人\s+([^\d\s][^\d]*?)\s+(\d{2}(?:\.\d)?)\b", text)
+    m = JOCKEY_RE.search(text)
     if m:
         race["騎手"] = m.group(1).strip()
         race["斤量"] = m.group(2)
 
-    m = re.search(r"(\d+(?:-\d+){1,3})", text)
+    m = CORNER_RE.search(text)
     if m:
         race["コーナー通過順"] = m.group(1)
 
-    m = re.search(r"\((\d{2}\.\d)\)\s+(\d+\([+\-]?\d+\))", text)
+    m = LAST3F_WEIGHT_RE.search(text)
     if m:
         race["上り"] = m.group(1)
         race["馬体重"] = m.group(2)
     else:
-        m = re.search(r"(\d+\([+\-]?\d+\))", text)
+        m = WEIGHT_RE.search(text)
         if m:
             race["馬体重"] = m.group(1)
 
@@ -180,23 +268,42 @@ def _extract_past_race_from_text(text):
     return race
 
 
-def parse_past_races_html(html, horse_id):
+def index_horse_links(soup):
+    """
+    馬柱ページ内の馬リンクを horse_id ごとにまとめる（ページ全体の走査は1回だけ）
+    
+    Args:
+        soup (BeautifulSoup): 馬柱ページの解析結果
+    
+    Returns:
+        dict: {horse_id: 最初に現れた <a> 要素}
+    """
+    horse_links = {}
+    for a in soup.find_all("a", href=True):
+        for horse_id in HORSE_ID_RE.findall(a["href"]):
+            horse_links.setdefault(horse_id, a)
+    return horse_links
+
+
+def parse_past_races_html(soup, horse_id, horse_links=None):
     """
-    馬柱ページ（shutuba_past.html）のHTMLを解析し、
+    解析済みの馬柱ページ（shutuba_past.html）から
     指定した horse_id の過去走データを抽出
     
     Args:
-        html (str): 馬柱ページのHTML
+        soup (BeautifulSoup): 馬柱ページの解析結果（レースごとに1回だけ解析したもの）
         horse_id (str): 対象馬のhorse_id
+        horse_links (dict|None): index_horse_links() の結果。None の場合はページを走査して探す
     
     Returns:
         list: 過去走データのリスト
     """
-    soup = BeautifulSoup(html, "html.parser")
     past_races = []
     
     # 馬名リンクを探して、該当馬のブロックを特定
-    horse_link = soup.find("a", href=lambda x: x and f"/horse/{horse_id}" in x)
+    horse_link = horse_links.get(horse_id) if horse_links is not None else None
+    if horse_link is None:
+        horse_link = soup.find("a", href=lambda x: x and f"/horse/{horse_id}" in x)
     if not horse_link:
         print(f"[WARN] horse_id={horse_id} のリンクが見つかりません")
         return past_races
@@ -214,64 +321,70 @@ def parse_past_races_html(html, horse_id):
     tds = tr.find_all("td")
     print(f"[DEBUG] horse_id={horse_id} td_count={len(tds)}")
 
+    seen = set()
+
+    def add_race(race):
+        # 同じレースは1回だけ追加し、MAX_PAST_RACES 走そろったら True（以降の解析は不要）
+        key = (race.get("開催日", ""), race.get("競馬場", ""), race.get("レース番号", ""), race.get("距離", ""))
+        if key not in seen:
+            seen.add(key)
+            past_races.append(race)
+        return len(past_races) >= MAX_PAST_RACES
+
     # まずは td 単位で抽出（NAR向け）
     for td in tds:
         td_text = td.get_text(" ", strip=True)
-        if not re.search(r"\d{4}\.\d{2}\.\d{2}", td_text):
+        if not DATE_RE.search(td_text):
             continue
         race = _extract_past_race_from_text(td_text)
-        if race:
-            past_races.append(race)
+        if race and add_race(race):
+            break
 
     # td抽出で失敗した場合は行全体を日付ごとに分割して再試行
     if not past_races:
         row_text = tr.get_text(" ", strip=True)
-        segments = [seg.strip() for seg in re.split(r"(?=\d{4}\.\d{2}\.\d{2})", row_text) if seg.strip()]
-        for seg in segments:
+        for seg in DATE_SPLIT_RE.split(row_text):
+            seg = seg.strip()
+            if not seg:
+                continue
             race = _extract_past_race_from_text(seg)
-            if race:
-                past_races.append(race)
-
-    deduped = []
-    seen = set()
-    for race in past_races:
-        key = (race.get("開催日", ""), race.get("競馬場", ""), race.get("レース番号", ""), race.get("距離", ""))
-        if key in seen:
-            continue
-        seen.add(key)
-        deduped.append(race)
+            if race and add_race(race):
+                break
 
-    deduped = deduped[:5]
-    if not deduped:
+    if not past_races:
         print(f"[WARN] horse_id={horse_id} の過去走抽出に失敗しました")
     else:
-        print(f"[DEBUG] horse_id={horse_id} parsed_past_races={len(deduped)}")
+        print(f"[DEBUG] horse_id={horse_id} parsed_past_races={len(past_races)}")
 
-    return deduped
+    return past_races
 
 
 # ====================================================================
 # メイン処理
 # ====================================================================
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python fetch_past_races.py YYYYMMDD")
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    use_cache = '--cache' in sys.argv[1:]
+    make_backup = '--backup' in sys.argv[1:]
+    
+    if len(args) < 1:
+        print("Usage: python fetch_past_races.py YYYYMMDD [--cache] [--backup]")
         sys.exit(1)
     
-    ymd = sys.argv[1]
+    ymd = args[0]
     input_file = f"race_data_{ymd}.json"
     
     if not Path(input_file).exists():
         print(f"[ERROR] {input_file} が見つかりません")
         sys.exit(1)
     
-    # バックアップ作成
-    backup_file = f"race_data_{ymd}.json.bak"
-    shutil.copy(input_file, backup_file)
-    print(f"[INFO] バックアップを作成しました: {backup_file}")
+    # 保存は一時ファイル経由の置き換えで途中終了しても元ファイルは壊れないので、バックアップは指定時のみ
+    if make_backup:
+        backup_file = f"race_data_{ymd}.json.bak"
+        shutil.copy(input_file, backup_file)
+        print(f"[INFO] バックアップを作成しました: {backup_file}")
     
-    with open(input_file, "r", encoding="utf-8") as f:
-        race_data = json.load(f)
+    race_data = load_json(input_file)
     
     print(f"[INFO] {input_file} を読み込みました")
     print(f"[DEBUG] レース数: {len(race_data.get('races', []))}")
@@ -283,8 +396,21 @@ def main():
     jra_count = 0
     nar_count = 0
     
+    # 馬柱ページのURL（JRA/NARでベースURLが異なる）
+    races = race_data["races"]
+    past_urls = [
+        f"{get_base_url(race['race_id'])}/race/shutuba_past.html?race_id={race['race_id']}"
+        for race in races
+    ]
+    
+    # 取得は並行して先に進め（開始間隔はレート制限で1秒ずつあける）、解析はこのスレッドでレース順に行う
+    executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+    pages = executor.map(
+        fetch_shutuba_past, [race["race_id"] for race in races], past_urls, [use_cache] * len(races)
+    )
+    
     # 各レースを処理
-    for race in race_data["races"]:
+    for race, past_url, html in zip(races, past_urls, pages):
         race_id = race["race_id"]
         
         # JRA/NAR判別
@@ -298,16 +424,16 @@ def main():
         
         print(f"\n[INFO] [{venue_type}] レース {race_id} の過去走データを取得中...")
         
-        # 馬柱ページのURL
-        past_url = f"{base_url}/race/shutuba_past.html?race_id={race_id}"
         print(f"[DEBUG] URL: {past_url}")
         
-        # HTML取得
-        html = http_get(past_url)
         if not html:
             print(f"[WARN] {race_id} の馬柱ページ取得失敗")
             continue
         
+        # 馬柱ページの解析はレースごとに1回（各馬はこの解析結果から抜き出す）
+        soup = BeautifulSoup(html, "html.parser", parse_only=PAST_PAGE_STRAINER)
+        horse_links = index_horse_links(soup)
+        
         # 各馬の過去走データを取得
         for horse in race.get("horses", []):
             horse_id = horse.get("horse_id")
@@ -316,7 +442,7 @@ def main():
                 continue
             
             # 過去走データを抽出
-            past_races = parse_past_races_html(html, horse_id)
+            past_races = parse_past_races_html(soup, horse_id, horse_links)
             
             # 馬データに追加
             horse["past_races"] = past_races
@@ -334,9 +460,8 @@ def main():
                 print(f"  ✅ {horse['馬名']}: {len(past_races)}走分取得")
             else:
                 print(f"  ⚠️ {horse['馬名']}: 0走（データなし）")
-        
-        # レート制限（1秒待機）
-        time.sleep(1)
+    
+    executor.shutdown()
     
     # 結果を保存
     output_file = input_file
@@ -350,24 +475,17 @@ def main():
     print(f"  - 警告馬数: {total_warning_horses}")
     print(f"  - 保存先: {output_file}")
     
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(race_data, f, ensure_ascii=False, indent=2)
+    save_json(race_data, output_file)
     
     print(f"\n[SUCCESS] {output_file} に過去走データを保存しました")
     
-    # 保存後の確認
-    with open(output_file, "r", encoding="utf-8") as f:
-        saved_data = json.load(f)
-    
-    # past_races フィールドの存在確認
-    has_past_races = False
-    for race in saved_data.get("races", []):
-        for horse in race.get("horses", []):
-            if "past_races" in horse and len(horse["past_races"]) > 0:
-                has_past_races = True
-                break
-        if has_past_races:
-            break
+    # past_races フィールドの存在確認（保存した内容はメモリ上の race_data と同一なので再読み込みしない）
+    # 今回1走でも取得していれば確定。0件の時だけ前回分が残っていないか走査する
+    has_past_races = total_past_races > 0 or any(
+        horse.get("past_races")
+        for race in race_data["races"]
+        for horse in race.get("horses", [])
+    )
     
     if has_past_races:
         print(f"[SUCCESS] past_races フィールドの存在を確認しました")
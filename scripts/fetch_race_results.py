@@ -1,12 +1,35 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-import json
 import sys
 import os
 from datetime import datetime
 import time
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from itertools import combinations as iter_combinations
+from operator import itemgetter
+
+from json_io import dumps, load_json, save_json
+
+# 結果ページはレースごとに同じホストへ取りに行くので接続を使い回す（一時的な5xxは短い間隔で再試行）
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+))
+
+# 結果ページの先読み数と、リクエスト開始の最小間隔（秒）
+RESULT_FETCH_WORKERS = 4
+REQUEST_INTERVAL = 1.0
+
+_rate_lock = threading.Lock()
+_next_request_at = 0.0
+
+# 先読み中の結果ページ {url: Future}（取り出したら消す）
+_prefetched_pages = {}
 
 
 # ============================================================
@@ -37,7 +60,7 @@ def calculate_race_verification(all_horses_result, betting_plan, synthetic_odds,
 
     # 3. スコアTop1/Top2の着順
     scored_horses  = [h for h in all_horses_result if h.get('DASスコア') is not None]
-    scored_sorted  = sorted(scored_horses, key=lambda h: h['DASスコア'], reverse=True)
+    scored_sorted  = sorted(scored_horses, key=itemgetter('DASスコア'), reverse=True)
     verification['score_top1_rank'] = scored_sorted[0]['着順'] if len(scored_sorted) >= 1 else None
     verification['score_top2_rank'] = scored_sorted[1]['着順'] if len(scored_sorted) >= 2 else None
     verification['score_top1_in_top3'] = (
@@ -104,7 +127,7 @@ def resolve_effective_investment(race, betting_plan, predicted_combinations, pre
         return declared_best, 0
 
     stake_reason = str((betting_plan or {}).get('賭け金調整') or '')
-    m = re.search(r'(\d+)円/点', stake_reason)
+    m = _STAKE_PER_BET_RE.search(stake_reason)
     if m:
         per_bet = int(m.group(1))
     else:
@@ -131,19 +154,52 @@ def _extract_info_box_message(soup):
     box = soup.select_one('.Race_Infomation_Box')
     if not box:
         return ''
-    return re.sub(r'\s+', ' ', box.get_text(' ', strip=True)).strip()
+    return _WHITESPACE_RE.sub(' ', box.get_text(' ', strip=True)).strip()
+
+
+_DIGITS_RE = re.compile(r'\d+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_STAKE_PER_BET_RE = re.compile(r'(\d+)円/点')
+_WEATHER_RE = re.compile(r'天候[:\s]*([^\s/]+)')
+_TRACK_CONDITION_RE = re.compile(r'馬場[:\s]*([^\s/]+)')
 
+# 払戻テーブル: trクラスで券種を識別（文字化けに依存しない確実な方法）
+PAYOUT_TR_CLASS_MAP = {
+    'Tansho':  '単勝',
+    'Fukusho': '複勝',
+    'Wakuren': '枠連',
+    'Umaren':  '馬連',
+    'Wide':    'ワイド',
+    'Wakutan': '枠単',
+    'Umatan':  '馬単',
+    'Fuku3':   '三連複',
+    'Tan3':    '三連単',
+}
 
-def _looks_like_result_row(row):
-    cols = row.select('td')
-    if len(cols) < 5:
-        return False
-    rank_text = cols[0].get_text(strip=True)
-    return bool(re.fullmatch(r'\d+', rank_text))
+# クラスで判定できない行は th テキストで券種を判定
+PAYOUT_TH_MAP = {
+    '単勝':'単勝','複勝':'複勝','枠連':'枠連','馬連':'馬連',
+    '馬単':'馬単','ワイド':'ワイド','三連複':'三連複','三連単':'三連単',
+    '3連複':'三連複','3連単':'三連単'
+}
 
+# 払戻金テキストから桁区切り・通貨記号を1回で取り除く
+_PAYOUT_STRIP = str.maketrans('', '', ',円¥')
 
-def _result_like_rows(table):
-    return [r for r in table.select('tr') if _looks_like_result_row(r)]
+
+def _split_table_rows(table):
+    # 行とセルの走査はテーブルごとに1回だけ：(全行, tdを持つ行, 着順行らしい行) を返す
+    table_rows = table.select('tr')
+    td_rows = []
+    result_rows = []
+    for row in table_rows:
+        cols = row.select('td')
+        if not cols:
+            continue
+        td_rows.append(row)
+        if len(cols) >= 5 and _DIGITS_RE.fullmatch(cols[0].get_text(strip=True)):
+            result_rows.append(row)
+    return table_rows, td_rows, result_rows
 
 def fetch_race_results(ymd):
     """
@@ -163,8 +219,7 @@ def fetch_race_results(ymd):
     # まず final_predictions_{ymd}.json を試みる
     if os.path.exists(pred_file):
         try:
-            with open(pred_file, 'r', encoding='utf-8') as f:
-                predictions_data = json.load(f)
+            predictions_data = load_json(pred_file)
             print(f"✅ {pred_file} を使用")
         except Exception as e:
             print(f"⚠️ {pred_file} の読み込み失敗: {e}")
@@ -176,8 +231,7 @@ def fetch_race_results(ymd):
             print(f"❌ エラー: {pred_file} も {fallback_file} も見つかりません")
             return None
         try:
-            with open(fallback_file, 'r', encoding='utf-8') as f:
-                predictions_data = json.load(f)
+            predictions_data = load_json(fallback_file)
             print(f"⚠️ {pred_file} が見つからないため {fallback_file} を使用")
         except Exception as e:
             print(f"❌ エラー: {fallback_file} の読み込み失敗: {e}")
@@ -252,9 +306,7 @@ def fetch_race_results(ymd):
             "races": []
         }
         output_filename = f'race_results_{ymd}.json'
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            import json as _json
-            _json.dump(no_pred_result, f, ensure_ascii=False, indent=2)
+        save_json(no_pred_result, output_filename)
         print(f"✅ {output_filename} を生成（予想なし）")
         return no_pred_result
 
@@ -262,6 +314,10 @@ def fetch_race_results(ymd):
 
     results = []
 
+    # 結果ページは並行して先読みし、リクエスト間隔はレート制限で1秒ずつあける
+    executor = ThreadPoolExecutor(max_workers=RESULT_FETCH_WORKERS)
+    prefetch_result_pages([race.get('race_id') for race in target_races if race.get('race_id')], executor)
+
     for idx, race in enumerate(target_races, 1):
         prediction_type = race.get('_prediction_type', 'recommend')
         prediction_label = race.get('_prediction_label', '推奨')
@@ -422,6 +478,10 @@ def fetch_race_results(ymd):
                 print(f"  ℹ️ virtual_bets_plan を betting_planから自動生成: {list(virtual_bets_plan.keys())}")
         virtual_bets_result = {}
         actual_payouts = race_result.get('payouts', {})
+        # 上位3頭（着順順）は全仮想買い目で共通なので、レースごとに1回だけ分解しておく
+        top3_list = (race_result.get('sanrenpuku_result') or '').split('-')
+        top3_nums = frozenset(top3_list)
+        top2_nums = frozenset(top3_list[:2])
 
         for bet_key, bet_info in virtual_bets_plan.items():
             bet_type = bet_info.get('type', '')
@@ -434,8 +494,7 @@ def fetch_race_results(ymd):
                 # 正しい計算式: 払戻オッズ(100円あたり) × 投資額 ÷ 100
                 # 例: オッズ210円 × 投資300円 ÷ 100 = 630円
                 horse_num = str(bet_info.get('馬番', ''))
-                top3_list = (race_result.get('sanrenpuku_result') or '').split('-')
-                hit_v = horse_num in top3_list
+                hit_v = horse_num in top3_nums
                 if hit_v:
                     odds_per_100 = actual_payouts.get('複勝', 0)
                     payout_v = round(odds_per_100 * investment_v / 100)
@@ -445,7 +504,6 @@ def fetch_race_results(ymd):
             elif bet_type in ('ワイド', '馬連'):
                 combo = bet_info.get('組み合わせ', '')
                 combo_nums = set(combo.split('-'))
-                top3_nums = set((race_result.get('sanrenpuku_result') or '').split('-'))
                 if bet_type == 'ワイド':
                     # ワイド: 上位3頭中に2頭が含まれれば的中
                     if len(combo_nums & top3_nums) >= 2:
@@ -455,7 +513,6 @@ def fetch_race_results(ymd):
                         payout_v = round(odds_per_100 * investment_v / 100)
                 else:
                     # 馬連: 1着・2着の2頭が一致
-                    top2_nums = set((race_result.get('sanrenpuku_result') or '').split('-')[:2])
                     if combo_nums == top2_nums:
                         # Bug Fix ③: 馬連払戻計算修正 (オッズ×投資額÷100)
                         hit_v = True
@@ -576,8 +633,8 @@ def fetch_race_results(ymd):
             'weather': race_result.get('weather', ''),
             'track_condition': race_result.get('track_condition', '')
         })
-        
-        time.sleep(1)
+    
+    executor.shutdown()
     
     total_races = len(results)
     hit_count = sum(1 for r in results if r['status'] == '的中')
@@ -653,12 +710,14 @@ def fetch_race_results(ymd):
         'races': results
     }
     
+    # 同じ内容を2ファイルに書くので、エンコードは1回だけ
+    payload = dumps(output_data)
     output_filename = f'race_results_{ymd}.json'
-    with open(output_filename, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    with open(output_filename, 'wb') as f:
+        f.write(payload)
     
-    with open('latest_results.json', 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    with open('latest_results.json', 'wb') as f:
+        f.write(payload)
     
     print(f"✅ 結果を {output_filename} と latest_results.json に保存しました")
     
@@ -685,7 +744,23 @@ def get_venue_info(race_id):
     return 'local', local_venues.get(venue_code, f"不明({venue_code})")
 
 
-def fetch_single_race_result(race_id, ymd):
+def _wait_for_request_slot():
+    # 全スレッド共通で、リクエストの開始間隔を REQUEST_INTERVAL 秒以上あける
+    global _next_request_at
+    with _rate_lock:
+        now = time.monotonic()
+        start_at = max(now, _next_request_at)
+        _next_request_at = start_at + REQUEST_INTERVAL
+    if start_at > now:
+        time.sleep(start_at - now)
+
+
+def _paced_get(url, headers):
+    _wait_for_request_slot()
+    return _SESSION.get(url, headers=headers, timeout=15)
+
+
+def result_page_request(race_id):
     race_type, venue_name = get_venue_info(race_id)
     
     if race_type == 'central':
@@ -701,18 +776,40 @@ def fetch_single_race_result(race_id, ymd):
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Referer': base_url
     }
+    return race_type, venue_name, url_candidates, headers
+
+
+def prefetch_result_pages(race_ids, executor):
+    """
+    各レースの最初の結果ページURLを先に取りに行く（解析・出力はレース順のまま）
+    """
+    for race_id in race_ids:
+        try:
+            _, _, url_candidates, headers = result_page_request(race_id)
+        except Exception:
+            continue  # 取得時に通常どおり処理させる
+        url = url_candidates[0]
+        if url not in _prefetched_pages:
+            _prefetched_pages[url] = executor.submit(_paced_get, url, headers)
+
+
+def fetch_single_race_result(race_id, ymd):
+    race_type, venue_name, url_candidates, headers = result_page_request(race_id)
     
     try:
         print(f"  🏇 {race_type.upper()} - {venue_name}")
         
         soup = None
-        rows = []
+        td_rows = []
+        result_rows = []
         result_table = None
         last_error = ''
         
         for attempt_idx, url in enumerate(list(dict.fromkeys(url_candidates)), 1):
             try:
-                response = requests.get(url, headers=headers, timeout=15)
+                # 先読み済みならその結果を使う（1回きり。再取得時は改めて取りに行く）
+                prefetched = _prefetched_pages.pop(url, None)
+                response = prefetched.result() if prefetched else _paced_get(url, headers)
                 response.raise_for_status()
             except requests.RequestException as e:
                 last_error = f"ネットワークエラー: {e}"
@@ -747,10 +844,8 @@ def fetch_single_race_result(race_id, ymd):
                     if table_id in seen_tables:
                         continue
                     seen_tables.add(table_id)
-                    table_rows = table.select('tr')
-                    result_rows = _result_like_rows(table)
-                    td_rows = [r for r in table_rows if r.select('td')]
-                    candidate_tables.append((len(result_rows), len(td_rows), len(table_rows), selector, table))
+                    table_rows, td_rows, result_rows = _split_table_rows(table)
+                    candidate_tables.append((len(result_rows), len(td_rows), len(table_rows), selector, table, td_rows, result_rows))
             
             if not candidate_tables:
                 info_msg = _extract_info_box_message(soup)
@@ -758,7 +853,7 @@ def fetch_single_race_result(race_id, ymd):
                 continue
             
             candidate_tables.sort(key=lambda x: (x[0], x[1], x[2]), reverse=True)
-            best_result_rows, best_td_rows, best_total_rows, best_selector, best_table = candidate_tables[0]
+            best_result_rows, best_td_rows, best_total_rows, best_selector, best_table, td_rows, result_rows = candidate_tables[0]
             print(f"  📊 result table: {best_selector} rows={best_total_rows} td_rows={best_td_rows} result_rows={best_result_rows}")
             
             if best_result_rows < 3:
@@ -770,7 +865,6 @@ def fetch_single_race_result(race_id, ymd):
                 continue
             
             result_table = best_table
-            rows = result_table.select('tr')
             break
         
         if not result_table:
@@ -781,9 +875,10 @@ def fetch_single_race_result(race_id, ymd):
         horse_weights = []
         all_horses_data = []  # Phase1: 全馬着順データ
         
-        all_data_rows = _result_like_rows(result_table)
+        # 候補選びで分類済みの行をそのまま使う（着順行が3未満ならtdを持つ全行）
+        all_data_rows = result_rows
         if len(all_data_rows) < 3:
-            all_data_rows = [r for r in rows if r.select('td')]
+            all_data_rows = td_rows
         data_rows = all_data_rows[:3]
         
         # ─── 全馬データ取得（Phase1） ───────────────────────
@@ -924,21 +1019,6 @@ def fetch_single_race_result(race_id, ymd):
         payouts = {}
         sanrenpuku_payout = 0
 
-        import re as _re
-
-        # trクラスで券種を識別（文字化けに依存しない確実な方法）
-        TR_CLASS_MAP = {
-            'Tansho':  '単勝',
-            'Fukusho': '複勝',
-            'Wakuren': '枠連',
-            'Umaren':  '馬連',
-            'Wide':    'ワイド',
-            'Wakutan': '枠単',
-            'Umatan':  '馬単',
-            'Fuku3':   '三連複',
-            'Tan3':    '三連単',
-        }
-
         if payout_tables:
             for table in payout_tables:
                 for row in table.select('tr'):
@@ -946,8 +1026,8 @@ def fetch_single_race_result(race_id, ymd):
                     # trクラスで券種を特定
                     bet_type = None
                     for cls in tr_classes:
-                        if cls in TR_CLASS_MAP:
-                            bet_type = TR_CLASS_MAP[cls]
+                        if cls in PAYOUT_TR_CLASS_MAP:
+                            bet_type = PAYOUT_TR_CLASS_MAP[cls]
                             break
                     # クラスで判定できなければthテキストにフォールバック
                     if not bet_type:
@@ -955,12 +1035,7 @@ def fetch_single_race_result(race_id, ymd):
                         if not th:
                             continue
                         raw = th.get_text(strip=True)
-                        fallback_map = {
-                            '単勝':'単勝','複勝':'複勝','枠連':'枠連','馬連':'馬連',
-                            '馬単':'馬単','ワイド':'ワイド','三連複':'三連複','三連単':'三連単',
-                            '3連複':'三連複','3連単':'三連単'
-                        }
-                        bet_type = fallback_map.get(raw)
+                        bet_type = PAYOUT_TH_MAP.get(raw)
                         if not bet_type:
                             continue
 
@@ -972,17 +1047,9 @@ def fetch_single_race_result(race_id, ymd):
                             continue
                         payout_td = all_td[1]
 
-                    payout_text = payout_td.get_text(separator='\n', strip=True)
-                    payout_values = []
-                    for seg in payout_text.split('\n'):
-                        clean = seg.replace(',', '').replace('円', '').replace('¥', '').strip()
-                        for num_str in _re.findall(r'\d+', clean):
-                            try:
-                                v = int(num_str)
-                                if v >= 100:
-                                    payout_values.append(v)
-                            except ValueError:
-                                pass
+                    # 行ごとに分けて区切り記号を除いても、改行は残るので全体を1回で走査すれば同じ結果になる
+                    payout_text = payout_td.get_text(separator='\n', strip=True).translate(_PAYOUT_STRIP)
+                    payout_values = [v for v in map(int, _DIGITS_RE.findall(payout_text)) if v >= 100]
 
                     if payout_values:
                         if bet_type == '複勝':
@@ -1007,12 +1074,11 @@ def fetch_single_race_result(race_id, ymd):
         
         if race_data_box:
             data_text = race_data_box.get_text()
-            import re
-            weather_match = re.search(r'天候[:\s]*([^\s/]+)', data_text)
+            weather_match = _WEATHER_RE.search(data_text)
             if weather_match:
                 weather = weather_match.group(1)
             
-            track_match = re.search(r'馬場[:\s]*([^\s/]+)', data_text)
+            track_match = _TRACK_CONDITION_RE.search(data_text)
             if track_match:
                 track_condition = track_match.group(1)
         
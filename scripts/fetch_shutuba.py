@@ -15,11 +15,24 @@ import requests
 from bs4 import BeautifulSoup
 
 # 中央競馬（JRA）場コード
-JRA_VENUE_CODES = ['01', '02', '03', '04', '05', '06', '07', '08', '09', '10']
+JRA_VENUE_CODES = frozenset({'01', '02', '03', '04', '05', '06', '07', '08', '09', '10'})
 
 # 地方競馬（NAR）場コード
 NAR_VENUE_CODES = ['30', '35', '36', '42', '43', '44', '45', '46', '47', '48', '50', '51', '54', '55', '65']
 
+# 場コード → 場名（レースごとに作り直さないようモジュール定数にする）
+JRA_VENUE_MAP = {
+    '01': '札幌', '02': '函館', '03': '福島', '04': '新潟',
+    '05': '東京', '06': '中山', '07': '中京', '08': '京都',
+    '09': '阪神', '10': '小倉'
+}
+
+NAR_VENUE_MAP = {
+    '30': '門別', '35': '盛岡', '36': '水沢', '42': '浦和', '43': '船橋',
+    '44': '大井', '45': '川崎', '46': '金沢', '47': '笠松', '48': '名古屋',
+    '50': '園田', '51': '姫路', '54': '高知', '55': '佐賀', '65': '帯広ば'
+}
+
 def get_base_url(race_id):
     """
     race_idから適切なベースURLを返す
@@ -153,22 +166,10 @@ def extract_race_info(soup, race_id, venue_type):
     # 競馬場
     venue_code = race_id[4:6]
     
-    jra_venue_map = {
-        '01': '札幌', '02': '函館', '03': '福島', '04': '新潟',
-        '05': '東京', '06': '中山', '07': '中京', '08': '京都',
-        '09': '阪神', '10': '小倉'
-    }
-    
-    nar_venue_map = {
-        '30': '門別', '35': '盛岡', '36': '水沢', '42': '浦和', '43': '船橋',
-        '44': '大井', '45': '川崎', '46': '金沢', '47': '笠松', '48': '名古屋',
-        '50': '園田', '51': '姫路', '54': '高知', '55': '佐賀', '65': '帯広ば'
-    }
-    
     if venue_type == 'JRA':
-        race_data['競馬場'] = jra_venue_map.get(venue_code, '不明')
+        race_data['競馬場'] = JRA_VENUE_MAP.get(venue_code, '不明')
     else:
-        race_data['競馬場'] = nar_venue_map.get(venue_code, '不明')
+        race_data['競馬場'] = NAR_VENUE_MAP.get(venue_code, '不明')
     
     race_data['レース番号'] = int(race_id[-2:])
     
@@ -6,7 +6,7 @@ DES_AI競馬予想 自動レポート生成システム
 
 import json
 import sys
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from collections import Counter, defaultdict
 from pathlib import Path
 import statistics
@@ -22,12 +22,12 @@ class RaceAnalyzer:
         Returns:
             str: 'ハイペース', 'ミドルペース', 'スローペース'
         """
-        runstyles = [h.get('推定脚質', '不明') for h in horses]
-        counter = Counter(runstyles)
+        # 1回の走査で脚質別頭数を数え、推定済み頭数も件数から求める
+        counter = Counter(h.get('推定脚質', '不明') for h in horses)
         
         nige_count = counter.get('逃げ', 0)
         senkou_count = counter.get('先行', 0)
-        total = len([r for r in runstyles if r != '不明'])
+        total = sum(counter.values()) - counter.get('不明', 0)
         
         if total == 0:
             return 'ミドルペース'
@@ -59,8 +59,7 @@ class RaceAnalyzer:
     @staticmethod
     def count_runstyles(horses):
         """脚質別頭数をカウント"""
-        runstyles = [h.get('推定脚質', '不明') for h in horses]
-        return dict(Counter(runstyles))
+        return dict(Counter(h.get('推定脚質', '不明') for h in horses))
 
 
 class ReportGenerator:
@@ -553,7 +552,8 @@ def main():
         output_file = f"daily_report_{datetime.now().strftime('%Y%m%d')}.json"
     
     elif report_type == "weekly":
-        today = datetime.now()
+        # 週の範囲は日付だけで決まるので date で計算する
+        today = date.today()
         start = today - timedelta(days=today.weekday())
         end = start + timedelta(days=6)
         report = generator.generate_weekly_report(
@@ -14,6 +14,8 @@ from datetime import datetime
 from collections import defaultdict
 import os
 import re
+from functools import lru_cache
+from operator import itemgetter
 
 BASE_URL = "https://raw.githubusercontent.com/aipapa247272/keiba-auto-gist-updater/main/"
 
@@ -35,6 +37,11 @@ def get_logic_version_by_date(ymd):
         return "v12以前"
 
 
+# バージョン文字列の各区切り内の数字（"13" → 13, "1a" → 1）
+_VERSION_NUM_RE = re.compile(r'(\d+)')
+
+
+@lru_cache(maxsize=None)
 def parse_logic_version(version):
     raw = str(version or '').strip()
     if not raw:
@@ -45,7 +52,7 @@ def parse_logic_version(version):
     normalized = raw[1:] if raw.lower().startswith('v') else raw
     parts = []
     for part in normalized.split('.'):
-        match = re.search(r'(\d+)', part)
+        match = _VERSION_NUM_RE.search(part)
         parts.append(int(match.group(1)) if match else 0)
     return True, tuple(parts)
 
@@ -325,7 +332,7 @@ def calculate_statistics(all_data, version_map):
                 'profit':        s['return'] - s['investment'],
                 'recovery_rate': round((s['return']/s['investment']*100) if s['investment']>0 else 0, 1)
             })
-        out.sort(key=lambda x: x['races'], reverse=True)
+        out.sort(key=itemgetter('races'), reverse=True)
         return out
 
     # ロジックバージョン別リスト（最新版が先頭）
@@ -365,7 +372,7 @@ def calculate_statistics(all_data, version_map):
             'profit':        s['return'] - s['investment'],
             'recovery_rate': round((s['return']/s['investment']*100) if s['investment']>0 else 0, 1)
         })
-    vb_list.sort(key=lambda x: x['recovery_rate'], reverse=True)
+    vb_list.sort(key=itemgetter('recovery_rate'), reverse=True)
 
     overall_hit_rate = round((total_hits/total_races*100) if total_races>0 else 0, 1)
     overall_recovery = round((total_return/total_investment*100) if total_investment>0 else 0, 1)
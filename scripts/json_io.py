@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON読み書きの共通処理
+
+orjson がインストールされていればそれを使い、無ければ標準の json にフォールバックする。
+どちらの場合も出力は UTF-8（ensure_ascii=False 相当）で、pretty=True なら2スペースインデント。
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """
+    JSON文字列（str / bytes）をデコードする
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, pretty=True):
+    """
+    オブジェクトをUTF-8のJSONバイト列にエンコードする
+
+    Args:
+        obj: エンコード対象
+        pretty (bool): Trueなら2スペースインデント、Falseなら区切り文字のみ
+
+    Returns:
+        bytes: JSONバイト列
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    if pretty:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    return text.encode('utf-8')
+
+
+def load_json(path):
+    """
+    JSONファイルを読み込む
+    """
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def save_json(data, path, compact=False):
+    """
+    JSONファイルを1回の書き込みで保存する
+
+    一時ファイルに書いてから置き換えるので、途中で落ちても既存ファイルが壊れない。
+
+    Args:
+        data: 保存するデータ
+        path: 出力先ファイル
+        compact (bool): Trueなら改行・インデントなし（中間ファイル向け）
+    """
+    payload = dumps(data, pretty=not compact)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)